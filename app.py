@@ -1,33 +1,79 @@
 import streamlit as st
-import pandas as pd
+import os
 import sys
 from pathlib import Path
-import plotly.express as px
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pickle
 
 # Setup path for imports
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
-import preprocessor, helper
+import helper, aggregates, athletes, binning, figcache, metrics, shared_frame
+
+# Plotting libraries are imported by the menus that draw charts; Medal Tally,
+# the landing view, needs none of them
 
 # Page config
 st.set_page_config(page_title="Olympics Analysis", layout="wide")
+metrics.serve_from_env()
 
 # ---------------- LOAD DATA ----------------
-@st.cache_data
-def load_data():
-    df = pd.read_csv(Path(__file__).parent / 'data' / 'athlete_events.csv')
-    region_df = pd.read_csv(Path(__file__).parent / 'data' / 'noc_regions.csv')
-    return preprocessor.preprocess(df, region_df)
-
-df = load_data()
-
-# ---------------- LOAD MODEL ----------------
-try:
-    model = pickle.load(open(Path(__file__).parent / 'models' / 'model.pkl', 'rb'))
-except:
-    model = None
+@metrics.cached('app.load_data', st.cache_resource)
+def load_data(version):
+    # One read-only, memory-mapped frame for every session (and every server
+    # process on the host); cache_data would hand each rerun its own copy
+    return shared_frame.load_shared_frame()
+
+@metrics.cached('app.load_medal_cube', st.cache_data)
+def load_medal_cube(version):
+    return helper.medal_cube(load_data(version))
+
+@metrics.cached('app.load_overall', st.cache_data)
+def load_overall(aggregates_version):
+    # Read from data/.cache; only computed from the frame the first time
+    return aggregates.load_overall(load_data(version), aggregates_version)
+
+@metrics.cached('app.load_region_index', st.cache_resource)
+def load_region_index(version):
+    # Shared read-only across sessions; cache_data would copy every slice per rerun
+    return helper.region_index(load_data(version))
+
+@metrics.cached('app.load_country_bundle', st.cache_data(max_entries=512))
+def load_country_bundle(version, country):
+    return helper.country_bundle(load_data(version), country, load_region_index(version))
+
+@metrics.cached('app.load_age_histogram', st.cache_data)
+def load_age_histogram(version):
+    athlete_df = load_data(version).drop_duplicates(subset=['Name', 'region'])
+    return binning.histogram_by_class(athlete_df, 'Age', 'Medal')
+
+@metrics.cached('app.load_height_weight', st.cache_data)
+def load_height_weight(version, sport, exact):
+    # Every athlete for small selections (or on request), grid counts otherwise
+    temp_df = helper.weight_v_height(load_data(version), sport)
+    if exact or len(temp_df) <= binning.EXACT_POINTS_LIMIT:
+        return temp_df[['Weight', 'Height', 'Medal', 'Sex']], True
+    return binning.grid_density(temp_df, 'Weight', 'Height', ['Medal', 'Sex']), False
+
+@metrics.cached('app.load_athlete_index', st.cache_resource)
+def load_athlete_index(version):
+    # Built once per dataset; every search and profile is a lookup into it
+    return athletes.AthleteIndex(load_data(version))
+
+@st.cache_resource
+def figure_cache():
+    # Rendered heatmaps as PNG bytes, shared by all sessions
+    return figcache.FigureCache()
+
+@st.cache_resource
+def start_prerender(figures_version):
+    # Once per process and dataset: draw every country's heatmap in the background
+    df, index = load_data(version), load_region_index(version)
+    return figcache.start_prerender(figure_cache(), figures_version, helper.country_year_list(df)[1][1:],
+                                    lambda country: helper.country_bundle(df, country, index)['heatmap'])
+
+version = shared_frame.frame_version()
+df = load_data(version)
+figures_version = aggregates.aggregates_version()
+if os.environ.get('OLYMPICS_PRERENDER_FIGURES'):
+    start_prerender(figures_version)
 
 # ---------------- TITLE ----------------
 st.title("🏅 Olympic Athlete Performance Prediction Engine")
@@ -42,7 +88,7 @@ st.sidebar.image('https://e7.pngegg.com/pngimages/1020/402/png-clipart-2024-summ
 
 menu = st.sidebar.radio(
     'Select an Option',
-    ('Medal Tally', 'Overall Analysis', 'Country-wise Analysis', 'Athlete wise Analysis')
+    ('Medal Tally', 'Overall Analysis', 'Country-wise Analysis', 'Athlete wise Analysis', 'Athlete Profile')
 )
 
 # ---------------- MEDAL TALLY ----------------
@@ -54,83 +100,144 @@ if menu == 'Medal Tally':
     selected_year = st.sidebar.selectbox("Select Year", years)
     selected_country = st.sidebar.selectbox("Select Country", countries)
 
-    result = helper.fetch_medal_tally(df, selected_year, selected_country)
+    result = helper.fetch_medal_tally(df, selected_year, selected_country, cube=load_medal_cube(version))
     st.dataframe(result)
 
 # ---------------- OVERALL ANALYSIS ----------------
 elif menu == 'Overall Analysis':
+    import plotly.express as px
+
     st.header("Top Statistics")
 
+    overall = load_overall(figures_version)
+    top_stats = overall['metrics']
+
     col1, col2, col3 = st.columns(3)
-    col1.metric("Editions", df['Year'].nunique())
-    col2.metric("Hosts", df['City'].nunique())
-    col3.metric("Sports", df['Sport'].nunique())
+    col1.metric("Editions", top_stats['Editions'])
+    col2.metric("Hosts", top_stats['Hosts'])
+    col3.metric("Sports", top_stats['Sports'])
 
     col1, col2, col3 = st.columns(3)
-    col1.metric("Events", df['Event'].nunique())
-    col2.metric("Nations", df['region'].nunique())
-    col3.metric("Athletes", df['Name'].nunique())
+    col1.metric("Events", top_stats['Events'])
+    col2.metric("Nations", top_stats['Nations'])
+    col3.metric("Athletes", top_stats['Athletes'])
 
     st.subheader("Participation Over Time")
 
-    st.plotly_chart(px.line(helper.data_over_time(df, 'region'), x="Edition", y="region"))
-    st.plotly_chart(px.line(helper.data_over_time(df, 'Event'), x="Edition", y="Event"))
-    st.plotly_chart(px.line(helper.data_over_time(df, 'Name'), x="Edition", y="Name"))
+    for col in aggregates.OVER_TIME_COLUMNS:
+        st.plotly_chart(px.line(overall['over_time'][col], x="Edition", y=col))
 
     st.subheader("Events Heatmap")
-    temp = df.drop_duplicates(['Year', 'Sport', 'Event'])
-    pt = temp.pivot_table(index='Sport', columns='Year', values='Event', aggfunc='count').fillna(0)
-
-    fig, ax = plt.subplots(figsize=(12, 12))
-    sns.heatmap(pt, ax=ax)
-    st.pyplot(fig)
+    st.image(figure_cache().get_or_render(figcache.figure_key(figures_version, 'events'),
+                                          lambda: figcache.heatmap_png(overall['events_pivot'])))
 
     st.subheader("Most Successful Athletes")
-    sport = st.selectbox('Select Sport', ['Overall'] + sorted(df['Sport'].unique()))
+    sport = st.selectbox('Select Sport', ['Overall'] + overall['sports'])
     st.dataframe(helper.most_successful(df, sport))
 
 # ---------------- COUNTRY ANALYSIS ----------------
 elif menu == 'Country-wise Analysis':
+    import plotly.express as px
+
     st.header("Country Analysis")
 
     country = st.sidebar.selectbox('Select Country', sorted(df['region'].dropna().unique()))
 
-    country_df = helper.yearwise_medal_tally(df, country)
+    bundle = load_country_bundle(version, country)
+
+    country_df = bundle['yearwise']
     st.plotly_chart(px.line(country_df, x="Year", y="Medal"))
 
     st.subheader("Sports Heatmap")
-    pt = helper.country_event_heatmap(df, country)
-    fig, ax = plt.subplots(figsize=(12, 12))
-    sns.heatmap(pt, ax=ax)
-    st.pyplot(fig)
+    st.image(figure_cache().get_or_render(figcache.figure_key(figures_version, 'country', country),
+                                          lambda: figcache.heatmap_png(bundle['heatmap'])))
 
     st.subheader("Top Athletes")
-    st.dataframe(helper.most_successful_countrywise(df, country))
+    st.dataframe(bundle['top_athletes'])
 
 # ---------------- ATHLETE ANALYSIS ----------------
 elif menu == 'Athlete wise Analysis':
-    st.header("Athlete Analysis")
+    import plotly.express as px
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-    athlete_df = df.drop_duplicates(subset=['Name', 'region']).copy()
+    st.header("Athlete Analysis")
 
     st.subheader("Age Distribution")
-    st.plotly_chart(px.histogram(athlete_df, x="Age", color="Medal"))
+    fig = px.bar(load_age_histogram(version), x="Age", y="count", color="Medal")
+    fig.update_layout(bargap=0)
+    st.plotly_chart(fig)
 
     st.subheader("Height vs Weight")
     sport = st.selectbox('Select Sport', ['Overall'] + sorted(df['Sport'].unique()))
-    temp_df = helper.weight_v_height(df, sport)
+    exact = st.checkbox("Plot every athlete", value=False,
+                        help=f"Selections over {binning.EXACT_POINTS_LIMIT:,} athletes are binned by default")
+    temp_df, is_exact = load_height_weight(version, sport, exact)
 
     fig, ax = plt.subplots()
-    sns.scatterplot(
-        data=temp_df,
-        x='Weight',
-        y='Height',
-        hue='Medal',
-        style='Sex',
-        ax=ax
-    )
+    if is_exact:
+        sns.scatterplot(
+            data=temp_df,
+            x='Weight',
+            y='Height',
+            hue='Medal',
+            style='Sex',
+            ax=ax
+        )
+    else:
+        # One marker per non-empty grid cell, sized by the number of athletes in it
+        sns.scatterplot(
+            data=temp_df,
+            x='Weight',
+            y='Height',
+            hue='Medal',
+            style='Sex',
+            size='count',
+            sizes=(4, 120),
+            alpha=0.7,
+            ax=ax
+        )
     st.pyplot(fig)
 
     st.subheader("Men vs Women Participation")
     final = helper.men_vs_women(df)
     st.plotly_chart(px.line(final, x="Year", y=["Male", "Female"]))
+
+# ---------------- ATHLETE PROFILE ----------------
+elif menu == 'Athlete Profile':
+    import plotly.express as px
+
+    st.header("Athlete Profile")
+
+    index = load_athlete_index(version)
+    query = st.text_input("Search athletes", placeholder="e.g. Phelps, or a misspelling like Micheal Phelps")
+    if not query.strip():
+        st.info(f"Search {len(index):,} athletes by any part of their name.")
+    else:
+        matches = index.search(query)
+        if matches.empty:
+            st.warning("No athlete matches that name.")
+        else:
+            labels = {row.ID: f"{row.Name} ({row.region}, {row.First}–{row.Last})" for row in matches.itertuples()}
+            athlete_id = st.selectbox("Athlete", list(labels), format_func=labels.get)
+            athlete = matches[matches['ID'] == athlete_id].iloc[0]
+
+            st.subheader(athlete['Name'])
+            col1, col2, col3, col4, col5 = st.columns(5)
+            col1.metric("Games", athlete['Games'])
+            col2.metric("Events", athlete['Events'])
+            col3.metric("Gold", athlete['Gold'])
+            col4.metric("Silver", athlete['Silver'])
+            col5.metric("Bronze", athlete['Bronze'])
+
+            history = index.profile(athlete_id)
+            medals = history.dropna(subset=['Medal']).groupby(['Year', 'Medal'], observed=True).size()
+            if len(medals):
+                fig = px.bar(medals.reset_index(name='count'), x='Year', y='count', color='Medal',
+                             color_discrete_map={'Gold': '#d4af37', 'Silver': '#c0c0c0', 'Bronze': '#cd7f32'})
+                fig.update_xaxes(type='category')
+                st.plotly_chart(fig)
+            st.dataframe(history, hide_index=True)
+
+            with st.expander("Other matches"):
+                st.dataframe(matches, hide_index=True)
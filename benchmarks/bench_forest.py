@@ -0,0 +1,84 @@
+"""Benchmark the compiled forest against sklearn's RandomForestClassifier.
+
+Verifies that CompiledForest probabilities and labels are identical to
+sklearn's, then reports single-row latency (the Manual Entry path) and batch
+throughput (the CSV upload / streaming path) separately.
+
+    python benchmarks/bench_forest.py --rows 272000
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from predict import load_artifact, select_rows
+from synthetic import make_athlete_events
+
+MODEL_PATH = Path(__file__).parent.parent / 'models' / 'model.pkl'
+
+
+def _latency(fn, repeats):
+    """Median and p99 wall time of ``fn()`` in microseconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1e6)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=272_000, help='synthetic rows to generate')
+    parser.add_argument('--repeats', type=int, default=200, help='single-row calls to time')
+    args = parser.parse_args()
+
+    data = load_artifact(str(MODEL_PATH))
+    model, engine, encoder = data['model'], data['engine'], data['encoder']
+
+    df = make_athlete_events(args.rows)
+    # Keep every complete row, not only the training categories, so the batch is large
+    X = encoder.transform(select_rows(df))
+    frame = encoder.to_frame(X)
+
+    # sklearn accumulates trees in completion order with threads; compare in tree order
+    n_jobs, model.n_jobs = model.n_jobs, 1
+    sk_proba = model.predict_proba(frame)
+    model.n_jobs = n_jobs
+    labels, proba = engine.predict_with_proba(X)
+    assert np.array_equal(proba, sk_proba), 'probabilities differ from sklearn'
+    assert np.array_equal(labels, model.predict(frame)), 'labels differ from sklearn'
+    print(f'{len(X):,} rows: probabilities and labels identical to sklearn')
+
+    record = select_rows(df).iloc[0]
+    one_frame = frame.iloc[[0]]
+
+    def sklearn_single():
+        model.predict(one_frame)
+        model.predict_proba(one_frame)
+
+    def engine_single():
+        engine.predict_with_proba(encoder.transform_one(record))
+
+    print(f'\nSingle row (encode + predict + predict_proba), {args.repeats} calls')
+    for name, fn in [('sklearn', sklearn_single), ('compiled', engine_single)]:
+        median, p99 = _latency(fn, args.repeats)
+        print(f'  {name:<9} median {median:9.1f} us   p99 {p99:9.1f} us')
+
+    print(f'\nBatch of {len(X):,} rows (predict + predict_proba)')
+    for name, fn in [('sklearn', lambda: (model.predict(frame), model.predict_proba(frame))),
+                     ('compiled', lambda: engine.predict_with_proba(X))]:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        print(f'  {name:<9} {elapsed:7.3f} s   {len(X) / elapsed:12,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark helper.fetch_medal_tally against the pre-cube implementation.
+
+Checks that the cube answers match the original row-scanning implementation
+exactly (every year and every country alone, a sample of year/country pairs
+and an unknown pair), then times both for a sample of dropdown changes.
+
+    python benchmarks/bench_medal_tally.py --rows 272000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+import helper, preprocessor
+from dataset import load_regions
+from synthetic import make_athlete_events
+
+
+def reference_fetch_medal_tally(df, year, country):
+    """The original implementation, kept as the source of truth."""
+    medal_df = df.drop_duplicates(subset=['Team','NOC','Games','Year','City','Sport','Event','Medal'])
+
+    if year == 'Overall' and country == 'Overall':
+        temp_df = medal_df
+    elif year == 'Overall':
+        temp_df = medal_df[medal_df['region'] == country]
+    elif country == 'Overall':
+        temp_df = medal_df[medal_df['Year'] == int(year)]
+    else:
+        temp_df = medal_df[(medal_df['Year'] == int(year)) & (medal_df['region'] == country)]
+
+    if country != 'Overall' and year == 'Overall':
+        x = temp_df.groupby('Year')[['Gold','Silver','Bronze']].sum().reset_index()
+    else:
+        x = temp_df.groupby('region')[['Gold','Silver','Bronze']].sum().reset_index()
+
+    x['total'] = x[['Gold','Silver','Bronze']].sum(axis=1)
+    return x
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=272_000)
+    parser.add_argument('--queries', type=int, default=50, help='views to time per implementation')
+    args = parser.parse_args()
+
+    df = preprocessor.preprocess(make_athlete_events(args.rows), load_regions())
+    years, countries = helper.country_year_list(df)
+    pairs = [(y, c) for y in years[1:] for c in countries[1:]]
+    queries = [(y, 'Overall') for y in years] + [('Overall', c) for c in countries[1:]]
+    queries += pairs[::max(len(pairs) // 200, 1)]
+
+    start = time.perf_counter()
+    cube = helper.medal_cube(df)
+    build_time = time.perf_counter() - start
+
+    for year, country in queries + [(1800, 'Atlantis')]:
+        pd.testing.assert_frame_equal(
+            helper.fetch_medal_tally(df, year, country, cube=cube),
+            reference_fetch_medal_tally(df, year, country),
+        )
+    print(f'{len(queries)} (year, country) views identical to the reference')
+
+    sample = queries[::max(len(queries) // args.queries, 1)][:args.queries]
+
+    start = time.perf_counter()
+    for year, country in sample:
+        reference_fetch_medal_tally(df, year, country)
+    reference_time = (time.perf_counter() - start) / len(sample)
+
+    start = time.perf_counter()
+    for year, country in sample:
+        helper.fetch_medal_tally(df, year, country, cube=cube)
+    cube_time = (time.perf_counter() - start) / len(sample)
+
+    print(f'rows: {len(df):,}  cube cells: {len(cube):,}  cube build: {build_time * 1e3:.1f} ms')
+    print(f'reference: {reference_time * 1e3:8.2f} ms/query')
+    print(f'cube:      {cube_time * 1e3:8.2f} ms/query  ({reference_time / cube_time:.0f}x faster)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Memory of the analytics frame as sessions and server processes are added.
+
+Sessions: ``st.cache_data`` hands every caller an unpickled copy of the frame,
+while the memory-mapped frame from ``shared_frame`` is one object for all of
+them. The first table reports the bytes those copies add for N sessions.
+
+Replicas: N processes run at the same time. Each one either preprocesses the
+CSV itself (private) or maps the shared frame (shared), then runs a few
+helpers that touch every row. The second table reports the total
+proportional set size (PSS) across the processes. Shared file pages are
+split between the processes that map them, so the shared total stays flat.
+PSS is read from /proc, so this part runs on Linux only.
+
+    python benchmarks/bench_shared.py --rows 272k --sessions 1 8 32 --replicas 1 2 4
+"""
+
+import argparse
+import pickle
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+import preprocessor
+import shared_frame
+from dataset import load_athlete_events, load_regions
+from run import parse_size
+from synthetic import make_athlete_events
+
+CHILD = r'''
+import sys, warnings
+warnings.filterwarnings('ignore')
+src, mode, csv_path, shared_dir = sys.argv[1:5]
+sys.path.insert(0, src)
+import helper, preprocessor, shared_frame
+from dataset import load_athlete_events, load_regions
+
+if mode == 'shared':
+    df = shared_frame.load_shared_frame(csv_path, shared_dir=shared_dir, cache_dir=shared_dir)
+else:
+    df = preprocessor.preprocess(load_athlete_events(csv_path, cache_dir=shared_dir), load_regions(), compact=True)
+helper.medal_cube(df)
+for col in ['region', 'Event', 'Name']:
+    helper.data_over_time(df, col)
+helper.men_vs_women(df)
+print('ready', flush=True)
+sys.stdin.readline()
+'''
+
+
+def pss_mb(pid: int) -> float:
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def replicas_pss(mode: str, n: int, csv_path: Path, shared_dir: Path) -> float:
+    """Total PSS in MB of ``n`` concurrently running processes."""
+    procs = [subprocess.Popen([sys.executable, '-c', CHILD, str(ROOT / 'src'), mode, str(csv_path), str(shared_dir)],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True) for _ in range(n)]
+    try:
+        for proc in procs:
+            if proc.stdout.readline().strip() != 'ready':
+                raise RuntimeError(f'{mode} child failed')
+        return sum(pss_mb(proc.pid) for proc in procs)
+    finally:
+        for proc in procs:
+            proc.communicate('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='272k', help='synthetic rows, e.g. 272k or 1m')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--replicas', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        csv_path = workdir / 'athlete_events.csv'
+        make_athlete_events(parse_size(args.rows), args.seed).to_csv(csv_path, index=False)
+        df = preprocessor.preprocess(load_athlete_events(csv_path, cache_dir=workdir), load_regions(), compact=True)
+        shared = shared_frame.load_shared_frame(csv_path, shared_dir=workdir, cache_dir=workdir)
+
+        print(f"{len(df):,} preprocessed rows\n")
+        print(f"{'sessions':>8} {'cache_data copies MB':>22} {'shared frame MB':>16}")
+        for n in args.sessions:
+            tracemalloc.start()
+            copies = [pickle.loads(pickle.dumps(df)) for _ in range(n)]
+            copied = tracemalloc.get_traced_memory()[0] / 2**20
+            tracemalloc.stop()
+            tracemalloc.start()
+            views = [shared for _ in range(n)]
+            viewed = tracemalloc.get_traced_memory()[0] / 2**20
+            tracemalloc.stop()
+            del copies, views
+            print(f"{n:>8} {copied:>22.1f} {viewed:>16.1f}")
+
+        if not Path('/proc/self/smaps_rollup').exists():
+            print("\n/proc/<pid>/smaps_rollup not available; skipping the replica measurement")
+            return
+        print(f"\n{'replicas':>8} {'private total PSS MB':>22} {'shared total PSS MB':>20}")
+        for n in args.replicas:
+            private = replicas_pss('private', n, csv_path, workdir)
+            mapped = replicas_pss('shared', n, csv_path, workdir)
+            print(f"{n:>8} {private:>22.1f} {mapped:>20.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark model startup: pickled bundle versus the mmap directory artifact.
+
+Each measurement runs in a fresh interpreter so nothing is cached in-process
+(the OS page cache stays warm, as it would for a restarted server). Reports
+the time to open the model, the time to the first prediction and the
+resident memory the process ends up with.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+CHILD = r'''
+import json, resource, sys, time, warnings
+warnings.filterwarnings('ignore')
+sys.path.insert(0, {src!r})
+import predict
+
+start = time.perf_counter()
+data = predict.load_artifact({model!r})
+opened = time.perf_counter()
+if {first_prediction!r}:
+    record = {{'Age': 25, 'Height': 180, 'Weight': 75, 'Sex': 'M', 'Sport': data['top_sports'][0],
+              'Event': data['top_events'][0], 'Team': data['top_teams'][0], 'Year': 2016}}
+    data['engine'].predict_with_proba(data['encoder'].transform_one(record))
+done = time.perf_counter()
+print(json.dumps({{'open_ms': (opened - start) * 1e3, 'total_ms': (done - start) * 1e3,
+                  'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+'''
+
+
+def measure(model, first_prediction, runs):
+    code = CHILD.format(src=str(ROOT / 'src'), model=str(model), first_prediction=first_prediction)
+    samples = [json.loads(subprocess.run([sys.executable, '-c', code], check=True, capture_output=True,
+                                         text=True).stdout) for _ in range(runs)]
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pickle', default=str(ROOT / 'models' / 'model.pkl'))
+    parser.add_argument('--artifact', default=str(ROOT / 'models' / 'model'))
+    parser.add_argument('--runs', type=int, default=5, help='fresh processes per measurement')
+    args = parser.parse_args()
+
+    print(f"{'model':<34} {'open ms':>10} {'first prediction ms':>20} {'peak RSS MB':>12}")
+    for label, model in [('pickle (model.pkl)', args.pickle), ('mmap artifact (model/)', args.artifact)]:
+        opened = measure(model, False, args.runs)
+        first = measure(model, True, args.runs)
+        print(f"{label:<34} {opened['open_ms']:>10.1f} {first['total_ms']:>20.1f} {first['rss_mb']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark an incremental model update against a full retrain.
+
+The synthetic history is split at its last Summer Games. The rows of that
+edition (plus the Winter Games held the same year) are the "new" data. 20% of
+them are held out for evaluation. The two models compared are:
+
+* full retrain:  train.train on history + new rows
+* incremental:   a model trained on the history, then update.update_model
+                 with the new rows
+
+Both are scored on the held-out new rows that either model can score.
+
+    python benchmarks/bench_update.py --rows 272000 --trees 10
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+import train
+from predict import preprocess_input
+from synthetic import make_athlete_events
+from update import update_model
+
+
+def score(bundle, df):
+    X = preprocess_input(df, bundle['features'], bundle['top_sports'], bundle['top_events'],
+                         bundle['top_teams'], encoder=bundle['encoder'])
+    return X.index, bundle['model'].predict_proba(X)[:, 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=272_000, help='synthetic rows to generate')
+    parser.add_argument('--trees', type=int, default=10, help='trees added by the update')
+    parser.add_argument('--replace-oldest', action='store_true')
+    args = parser.parse_args()
+
+    df = make_athlete_events(args.rows)
+    last_year = df.loc[df['Season'] == 'Summer', 'Year'].max()
+    new = df[df['Year'] == last_year]
+    history = df[df['Year'] != last_year]
+    holdout = new.sample(frac=0.2, random_state=0)
+    new_fit = new.drop(holdout.index)
+    print(f'{len(history):,} history rows, {len(new_fit):,} new rows ({last_year}), '
+          f'{len(holdout):,} held out')
+
+    base, _ = train.train(history)
+
+    start = time.perf_counter()
+    full, _ = train.train(pd.concat([history, new_fit]))
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    updated = update_model(base, new_fit, args.trees, args.replace_oldest)
+    update_seconds = time.perf_counter() - start
+
+    print(f'full retrain: {full_seconds:8.2f}s  ({full["model"].n_estimators} trees)')
+    print(f'incremental:  {update_seconds:8.2f}s  ({updated["model"].n_estimators} trees, '
+          f'{updated["updates"][-1]["new_features"]} new features)  '
+          f'{full_seconds / update_seconds:.1f}x faster')
+
+    full_index, full_proba = score(full, holdout)
+    updated_index, updated_proba = score(updated, holdout)
+    common = full_index.intersection(updated_index)
+    y = holdout.loc[common, 'Medal'].notna().to_numpy()
+    full_proba = full_proba[full_index.get_indexer(common)]
+    updated_proba = updated_proba[updated_index.get_indexer(common)]
+
+    print(f'held-out rows scored by both: {len(common):,}')
+    print(f'accuracy  full {np.mean((full_proba > 0.5) == y):.4f}  '
+          f'incremental {np.mean((updated_proba > 0.5) == y):.4f}')
+    print(f'mean |probability difference| {np.abs(full_proba - updated_proba).mean():.4f}')
+
+
+if __name__ == '__main__':
+    main()
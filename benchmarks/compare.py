@@ -0,0 +1,57 @@
+"""Compare two benchmark result files written by run.py.
+
+Cases are matched on (size, name). A case is flagged as a regression when its
+best time grows by more than ``--threshold`` (a ratio) and by at least
+``--min-ms``, so sub-millisecond noise is not reported.
+
+    python benchmarks/compare.py benchmarks/results/abc1234.json benchmarks/results/def5678.json
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+    return report, {(r['size'], r['name']): r for r in report['results']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='time ratio above which a case is a regression')
+    parser.add_argument('--min-ms', type=float, default=1.0,
+                        help='ignore changes smaller than this many milliseconds')
+    parser.add_argument('--fail', action='store_true', help='exit with status 1 on regressions')
+    args = parser.parse_args()
+
+    old_report, old = load(args.baseline)
+    new_report, new = load(args.candidate)
+    print(f"baseline {old_report['commit']}  vs  candidate {new_report['commit']}\n")
+    print(f"{'size':>6}  {'case':<48} {'old ms':>10} {'new ms':>10} {'ratio':>7} "
+          f"{'old MB':>8} {'new MB':>8}")
+
+    regressions = 0
+    for key in [k for k in new if k in old]:
+        before, after = old[key], new[key]
+        ratio = after['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+        slower = ratio > args.threshold and (after['seconds'] - before['seconds']) * 1e3 >= args.min_ms
+        regressions += slower
+        print(f"{key[0]:>6}  {key[1]:<48} {before['seconds'] * 1e3:>10.1f} "
+              f"{after['seconds'] * 1e3:>10.1f} {ratio:>6.2f}x "
+              f"{before['peak_mb']:>8.1f} {after['peak_mb']:>8.1f}{'  REGRESSION' if slower else ''}")
+
+    for key in sorted(set(old) ^ set(new)):
+        print(f"{key[0]:>6}  {key[1]:<48} only in {'baseline' if key in old else 'candidate'}")
+
+    print(f'\n{regressions} regression(s) above {args.threshold:.2f}x')
+    if args.fail and regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
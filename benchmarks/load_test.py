@@ -0,0 +1,102 @@
+"""Load test for the prediction service (src/serve.py) on localhost.
+
+Runs ``--clients`` concurrent keep-alive clients that each send ``--requests``
+single-athlete predictions, then reports throughput, client-side latency
+percentiles and the server's own /latency and /health numbers.
+
+    python src/serve.py &
+    python benchmarks/load_test.py --clients 16 --requests 200
+"""
+
+import argparse
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+
+SPORTS = ['Athletics', 'Swimming', 'Gymnastics', 'Rowing', 'Cycling']
+TEAMS = ['United States', 'France', 'Germany', 'Japan', 'Australia', 'Kenya']
+
+
+def make_record(rng: random.Random) -> dict:
+    sport = rng.choice(SPORTS)
+    sex = rng.choice(['M', 'F'])
+    return {
+        'Age': rng.randint(16, 40),
+        'Height': rng.randint(150, 210),
+        'Weight': rng.randint(45, 120),
+        'Sex': sex,
+        'Sport': sport,
+        'Event': f"{sport} {'Men' if sex == 'M' else 'Women'}'s 100 metres",
+        'Team': rng.choice(TEAMS),
+        'Year': rng.choice(range(1960, 2017, 4)),
+    }
+
+
+def _get(host, port, path):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request('GET', path)
+    payload = json.loads(conn.getresponse().read())
+    conn.close()
+    return payload
+
+
+def run_client(host, port, n_requests, seed, latencies, errors):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    for _ in range(n_requests):
+        body = json.dumps(make_record(rng)).encode()
+        start = time.perf_counter()
+        try:
+            conn.request('POST', '/predict', body, {'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except OSError as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append((time.perf_counter() - start) * 1e3)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help='requests per client')
+    args = parser.parse_args()
+
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=run_client,
+                         args=(args.host, args.port, args.requests, seed, latencies, errors))
+        for seed in range(args.clients)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f'{len(latencies):,} requests in {elapsed:.2f}s from {args.clients} clients '
+          f'({len(latencies) / elapsed:,.0f} req/s, {len(errors)} errors)')
+    if latencies:
+        print(f'client latency ms: p50 {statistics.median(latencies):.2f}  '
+              f'p90 {latencies[int(len(latencies) * 0.9) - 1]:.2f}  '
+              f'p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f}  max {latencies[-1]:.2f}')
+
+    print('server /latency:', json.dumps(_get(args.host, args.port, '/latency'), indent=2))
+    print('server /health: ', json.dumps(_get(args.host, args.port, '/health')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Cold-start profiler for the Streamlit pages.
+
+Every page is run in a fresh interpreter under ``python -X importtime``
+through Streamlit's AppTest harness. For each view (the page's first render,
+then every sidebar menu of app.py) it reports the render time and the modules
+that view imported for the first time, with their cumulative import cost.
+Streamlit itself is imported before the first render, as in a real server,
+and is reported separately.
+
+    python benchmarks/profile_startup.py
+    python benchmarks/profile_startup.py --page app.py --top 8
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Page -> options of its first sidebar radio; the first option is the default view
+PAGES = {
+    'app.py': ['Medal Tally', 'Overall Analysis', 'Country-wise Analysis', 'Athlete wise Analysis',
+                'Athlete Profile'],
+    'pages/01_Medal_Prediction.py': ['Manual Entry', 'Upload CSV'],
+}
+
+# Run as: python -X importtime -c CHILD <page> <options as JSON>
+CHILD = r'''
+import json, sys, time, warnings
+warnings.filterwarnings('ignore')
+page, options = sys.argv[1], json.loads(sys.argv[2])
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_ms = (time.perf_counter() - start) * 1e3
+
+def roots():
+    return {name.partition('.')[0] for name in sys.modules}
+
+views = []
+def timed(label, run):
+    before = roots()
+    start = time.perf_counter()
+    at = run()
+    views.append({'view': label, 'ms': (time.perf_counter() - start) * 1e3,
+                  'modules': sorted(roots() - before),
+                  'exceptions': [str(e.value) for e in at.exception]})
+    return at
+
+at = AppTest.from_file(page, default_timeout=600)
+at = timed(f'first render ({options[0]})', at.run)
+for option in options[1:]:
+    at = timed(option, lambda: at.sidebar.radio[0].set_value(option).run())
+print(json.dumps({'streamlit_ms': streamlit_ms, 'views': views}))
+'''
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Cumulative import time in ms per top-level module."""
+    costs = {}
+    for match in IMPORT_LINE.finditer(stderr):
+        _, cumulative, indent, name = match.groups()
+        if len(indent) == 1:
+            costs[name.partition('.')[0]] = costs.get(name.partition('.')[0], 0) + int(cumulative) / 1e3
+    return costs
+
+
+def profile(page: str, top: int):
+    options = PAGES[page]
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD, str(ROOT / page), json.dumps(options)],
+                          capture_output=True, text=True, cwd=ROOT)
+    if proc.returncode:
+        raise RuntimeError(f'{page} failed:\n{proc.stderr[-2000:]}')
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    costs = parse_importtime(proc.stderr)
+
+    print(f"\n{page}  (streamlit + AppTest import: {result['streamlit_ms']:.0f} ms)")
+    print(f"{'view':<36} {'render ms':>10} {'imports ms':>11}  heaviest new imports")
+    for view in result['views']:
+        imported = sorted(((costs.get(name, 0.0), name) for name in view['modules']), reverse=True)
+        heaviest = ', '.join(f'{name} {ms:.0f}' for ms, name in imported[:top] if ms >= 1)
+        errors = f"  EXCEPTIONS: {view['exceptions']}" if view['exceptions'] else ''
+        print(f"{view['view']:<36} {view['ms']:>10.0f} {sum(ms for ms, _ in imported):>11.0f}  "
+              f"{heaviest or '-'}{errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--page', choices=list(PAGES), help='profile one page only')
+    parser.add_argument('--top', type=int, default=5, help='heaviest imports to list per view')
+    args = parser.parse_args()
+
+    for page in [args.page] if args.page else PAGES:
+        profile(page, args.top)
+
+
+if __name__ == '__main__':
+    main()
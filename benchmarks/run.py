@@ -0,0 +1,275 @@
+"""Benchmark suite for the dashboard, training and prediction hot paths.
+
+Generates seeded synthetic datasets (see synthetic.py) at each requested size
+and times every function in src/helper.py, both preprocess modes, training and
+the prediction paths. Each case reports the best and median wall time over
+``--repeat`` runs plus the peak Python heap allocation of one extra traced run.
+Results are written as JSON so two commits can be compared with compare.py.
+
+    python benchmarks/run.py --sizes 10k 272k
+    python benchmarks/run.py --sizes 5m --skip train --output before.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+import binning
+import figcache
+import helper
+import preprocessor
+import profiler
+import shared_frame
+import train
+import whatif
+from athletes import AthleteIndex
+from dataset import load_athlete_events, load_regions, read_csv_typed
+from predict import load_artifact, predict_stream, preprocess_input, score_batch, select_rows
+from synthetic import make_athlete_events
+
+MODEL_PATH = ROOT / 'models' / 'model.pkl'
+ARTIFACT_PATH = ROOT / 'models' / 'model'
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+
+def parse_size(text: str) -> int:
+    """Accept 10000, 10k, 272K or 5m."""
+    text = text.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _first_prediction(model_path):
+    artifact = load_artifact(str(model_path))
+    record = {'Age': 25, 'Height': 180, 'Weight': 75, 'Sex': 'M', 'Sport': artifact['top_sports'][0],
+              'Event': artifact['top_events'][0], 'Team': artifact['top_teams'][0], 'Year': 2016}
+    return artifact['engine'].predict_with_proba(artifact['encoder'].transform_one(record))
+
+
+class Bench:
+    """Runs cases for one dataset size and collects their timings."""
+
+    def __init__(self, size: str, rows: int, repeat: int, skip=()):
+        self.size = size
+        self.rows = rows
+        self.repeat = repeat
+        self.skip = skip
+        self.results = []
+
+    def run(self, name: str, fn, repeat=None):
+        """Time ``fn()`` and return its result (None if the case is skipped)."""
+        if any(pattern in name for pattern in self.skip):
+            return None
+
+        times = []
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+
+        # Tracing slows allocation-heavy code down, so measure memory on a separate run
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        record = {
+            'size': self.size,
+            'rows': self.rows,
+            'name': name,
+            'seconds': min(times),
+            'median_seconds': statistics.median(times),
+            'peak_mb': peak / 2**20,
+        }
+        self.results.append(record)
+        print(f"{self.size:>6}  {name:<48} {record['seconds'] * 1e3:>10.1f} ms "
+              f"{record['peak_mb']:>9.1f} MB", flush=True)
+        return result
+
+
+def bench_size(size: str, rows: int, args, workdir: Path) -> list:
+    bench = Bench(size, rows, args.repeat, args.skip)
+
+    raw = make_athlete_events(rows, args.seed)
+    csv_path = workdir / f'athlete_events_{size}.csv'
+    raw.to_csv(csv_path, index=False)
+    regions = load_regions()
+
+    # ---------------- LOADING ----------------
+    bench.run('dataset.read_csv_typed', lambda: read_csv_typed(csv_path))
+    cache_dir = workdir / 'cache'
+    load_athlete_events(csv_path, cache_dir=cache_dir)
+    athletes = bench.run('dataset.load_athlete_events (cached)',
+                         lambda: load_athlete_events(csv_path, cache_dir=cache_dir))
+    if athletes is None:
+        athletes = load_athlete_events(csv_path, cache_dir=cache_dir)
+
+    # Constant memory, against read_csv_typed's whole frame
+    bench.run('profiler.profile_csv', lambda: profiler.profile_csv(csv_path, required=train.FEATURE_COLUMNS))
+
+    # ---------------- PREPROCESS ----------------
+    bench.run('preprocessor.preprocess', lambda: preprocessor.preprocess(athletes, regions))
+    df = bench.run('preprocessor.preprocess (compact)',
+                   lambda: preprocessor.preprocess(athletes, regions, compact=True))
+    if df is None:
+        df = preprocessor.preprocess(athletes, regions, compact=True)
+    shared_frame.save_frame(df, workdir / f'shared_{size}')
+    bench.run('shared_frame.open_frame', lambda: shared_frame.open_frame(workdir / f'shared_{size}'))
+
+    # ---------------- HELPER ----------------
+    # Run against the compact frame, which is what the dashboard caches
+    years, countries = helper.country_year_list(df)
+    year, country = years[-1], countries[1]
+    cube = helper.medal_cube(df)
+    top_sport = df['Sport'].value_counts().index[0]
+
+    bench.run('helper.country_year_list', lambda: helper.country_year_list(df))
+    bench.run('helper.medal_cube', lambda: helper.medal_cube(df))
+    for label, y, c in [('overall', 'Overall', 'Overall'), ('year', year, 'Overall'),
+                        ('country', 'Overall', country), ('year+country', year, country)]:
+        bench.run(f'helper.fetch_medal_tally ({label})',
+                  lambda y=y, c=c: helper.fetch_medal_tally(df, y, c, cube=cube))
+    bench.run('helper.fetch_medal_tally (no cube)',
+              lambda: helper.fetch_medal_tally(df, 'Overall', 'Overall'))
+    for col in ['region', 'Event', 'Name']:
+        bench.run(f'helper.data_over_time ({col})', lambda col=col: helper.data_over_time(df, col))
+    bench.run('helper.most_successful (Overall)', lambda: helper.most_successful(df, 'Overall'))
+    bench.run('helper.most_successful (sport)', lambda: helper.most_successful(df, top_sport))
+    bench.run('helper.yearwise_medal_tally', lambda: helper.yearwise_medal_tally(df, country))
+    bench.run('helper.country_event_heatmap', lambda: helper.country_event_heatmap(df, country))
+    bench.run('helper.most_successful_countrywise',
+              lambda: helper.most_successful_countrywise(df, country))
+    bench.run('helper.region_index', lambda: helper.region_index(df))
+    index = helper.region_index(df)
+    bench.run('helper.country_bundle (indexed)', lambda: helper.country_bundle(df, country, index))
+    bench.run('helper.weight_v_height (Overall)', lambda: helper.weight_v_height(df, 'Overall'))
+    bench.run('helper.weight_v_height (sport)', lambda: helper.weight_v_height(df, top_sport))
+    bench.run('helper.men_vs_women', lambda: helper.men_vs_women(df))
+
+    # ---------------- BINNING ----------------
+    athletes_df = df.drop_duplicates(subset=['Name', 'region'])
+    hw = helper.weight_v_height(df, 'Overall')
+    bench.run('binning.histogram_by_class (Age)', lambda: binning.histogram_by_class(athletes_df, 'Age'))
+    bench.run('binning.grid_density (Weight x Height)', lambda: binning.grid_density(hw, 'Weight', 'Height'))
+
+    # ---------------- ATHLETES ----------------
+    bench.run('athletes.AthleteIndex', lambda: AthleteIndex(df), repeat=1)
+    athlete_index = AthleteIndex(df)
+    athlete = athlete_index.summary.iloc[len(athlete_index) // 2]
+    name = athlete['Name']
+    bench.run('athletes.AthleteIndex.search (prefix)', lambda: athlete_index.search(name[:len(name) // 2]))
+    misspelt = name[1] + name[0] + name[2:]
+    bench.run('athletes.AthleteIndex + first fuzzy search', lambda: AthleteIndex(df).search(misspelt), repeat=1)
+    bench.run('athletes.AthleteIndex.search (fuzzy)', lambda: athlete_index.search(misspelt))
+    bench.run('athletes.AthleteIndex.profile', lambda: athlete_index.profile(athlete['ID']))
+    bench.run('athlete profile (Name scan)', lambda: df[df['Name'] == name].sort_values('Year'))
+
+    # ---------------- FIGURES ----------------
+    pt = helper.country_bundle(df, country, index)['heatmap']
+    figures = figcache.FigureCache(workdir / 'figures')
+    key = figcache.figure_key(size, 'country', country)
+    bench.run('figcache.heatmap_png (country)', lambda: figcache.heatmap_png(pt))
+    figures.put(key, figcache.heatmap_png(pt))
+    bench.run('figcache.get (memory)', lambda: figures.get(key))
+    bench.run('figcache.get (disk)', lambda: figcache.FigureCache(figures.directory).get(key))
+
+    # ---------------- TRAIN ----------------
+    bench.run('train.train', lambda: train.train(raw[train.FEATURE_COLUMNS + ['Medal']]), repeat=1)
+
+    # ---------------- PREDICT ----------------
+    # Always score with the committed model so timings are comparable across runs
+    bench.run('predict.load_artifact', lambda: load_artifact(str(MODEL_PATH)))
+    bench.run('artifact open + first prediction', lambda: _first_prediction(ARTIFACT_PATH))
+    data = load_artifact(str(MODEL_PATH))
+    engine, model, encoder = data['engine'], data['model'], data['encoder']
+    tops = data.get('top_sports'), data.get('top_events'), data.get('top_teams')
+
+    X = bench.run('predict.preprocess_input',
+                  lambda: preprocess_input(athletes, data['features'], *tops, encoder=encoder))
+    if X is None:
+        X = preprocess_input(athletes, data['features'], *tops, encoder=encoder)
+    inputs = athletes.loc[X.index]
+
+    bench.run('predict.score_batch (engine)', lambda: score_batch(engine, encoder, inputs))
+    bench.run('predict.score_batch (sklearn)', lambda: score_batch(model, encoder, inputs))
+    # Every complete row regardless of training categories, for a batch of realistic size
+    X_all = encoder.transform(select_rows(athletes))
+    bench.run('forest.predict_with_proba (all complete rows)', lambda: engine.predict_with_proba(X_all))
+    if len(inputs):
+        record = inputs.iloc[0].to_dict()
+        bench.run('predict single row (engine)',
+                  lambda: engine.predict_with_proba(encoder.transform_one(record)))
+        scorer = whatif.CachedScorer(engine)
+        scorer.predict_proba(encoder.transform_one(record))
+        bench.run('whatif.CachedScorer (hit)', lambda: scorer.predict_proba(encoder.transform_one(record)))
+        ages = whatif.sweep_axes('Age', [])
+        bench.run('Age sweep as single predictions',
+                  lambda: [engine.predict_proba(encoder.transform_one(dict(record, Age=age))) for age in ages['Age']])
+        bench.run('whatif.score_sweep (Age)', lambda: whatif.score_sweep(engine, encoder, record, ages))
+        bench.run('whatif.score_sweep (Age x Weight)',
+                  lambda: whatif.score_sweep(engine, encoder, record, whatif.sweep_axes('Age × Weight', [])))
+    output = workdir / f'predictions_{size}.parquet'
+    bench.run('predict.predict_stream',
+              lambda: predict_stream(str(MODEL_PATH), str(csv_path), str(output)), repeat=1)
+
+    return bench.results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=['10k', '272k'],
+                        help='dataset sizes, e.g. 10k 272k 5m')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip', nargs='*', default=[],
+                        help='skip cases whose name contains any of these strings')
+    parser.add_argument('--output', help='JSON file to write (default benchmarks/results/<commit>.json)')
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            results += bench_size(size.lower(), parse_size(size), args, Path(tmp))
+
+    report = {
+        'commit': commit,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__},
+        'results': results,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f'{commit}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Seeded synthetic athlete_events.csv generator.
+
+The real dataset is not part of the repository, so benchmarks run against a
+generated frame with the same schema and roughly the same shape: athletes
+compete for one NOC in one sport across several Games, most rows have no
+medal, and measurements are partially missing.
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REGIONS_PATH = Path(__file__).parent.parent / 'data' / 'noc_regions.csv'
+
+SPORTS = [
+    'Athletics', 'Swimming', 'Gymnastics', 'Rowing', 'Cycling', 'Cross Country Skiing',
+    'Shooting', 'Fencing', 'Alpine Skiing', 'Canoeing', 'Wrestling', 'Sailing', 'Biathlon',
+    'Ice Hockey', 'Equestrianism', 'Football', 'Hockey', 'Basketball', 'Water Polo',
+    'Boxing', 'Weightlifting', 'Judo', 'Volleyball', 'Handball', 'Tennis', 'Diving',
+    'Speed Skating', 'Bobsleigh', 'Archery', 'Table Tennis',
+]
+WINTER_SPORTS = {'Cross Country Skiing', 'Alpine Skiing', 'Biathlon', 'Ice Hockey',
+                 'Speed Skating', 'Bobsleigh'}
+DISCIPLINES = ['Individual', 'Team', '100 metres', '200 metres', '400 metres', 'Relay',
+               'Lightweight', 'Heavyweight', 'Singles', 'Doubles']
+CITIES = ['Athina', 'Paris', 'London', 'Stockholm', 'Antwerpen', 'Amsterdam', 'Los Angeles',
+          'Berlin', 'Helsinki', 'Melbourne', 'Roma', 'Tokyo', 'Mexico City', 'Munich',
+          'Montreal', 'Moskva', 'Seoul', 'Barcelona', 'Atlanta', 'Sydney', 'Beijing',
+          'Rio de Janeiro', 'Sankt Moritz', 'Lake Placid', 'Innsbruck', 'Sapporo']
+
+COLUMNS = ['ID', 'Name', 'Sex', 'Age', 'Height', 'Weight', 'Team', 'NOC', 'Games',
+           'Year', 'Season', 'City', 'Sport', 'Event', 'Medal']
+
+
+def _games():
+    """Return the (Year, Season, City) editions in dataset order."""
+    summer = [y for y in range(1896, 2017, 4) if y not in (1916, 1940, 1944)]
+    winter = [y for y in range(1924, 1993, 4) if y not in (1940, 1944)] + list(range(1994, 2015, 4))
+    games = [(y, 'Summer') for y in summer] + [(y, 'Winter') for y in winter]
+    return [(y, s, CITIES[i % len(CITIES)]) for i, (y, s) in enumerate(sorted(games))]
+
+
+def make_athlete_events(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Generate ``n_rows`` rows following the athlete_events.csv schema."""
+    rng = np.random.default_rng(seed)
+    regions = pd.read_csv(REGIONS_PATH)
+
+    # Athletes: fixed attributes, each appearing in ~2 rows on average
+    n_athletes = max(n_rows // 2, 1)
+    athlete_sex = rng.choice(np.array(['M', 'F']), n_athletes, p=[0.72, 0.28])
+    athlete_noc = rng.zipf(1.6, n_athletes) % len(regions)
+    athlete_sport = rng.zipf(1.4, n_athletes) % len(SPORTS)
+    athlete_height = rng.normal(176, 10, n_athletes).round()
+    athlete_weight = (rng.normal(70, 13, n_athletes) * 2).round() / 2
+    athlete_birth = rng.integers(1870, 1998, n_athletes)
+
+    athlete = rng.integers(0, n_athletes, n_rows)
+    athlete.sort()
+
+    games = _games()
+    game_years = np.array([g[0] for g in games])
+    # Athletes can only compete in Games after they turn 14
+    first = np.searchsorted(game_years, athlete_birth[athlete] + 14).clip(max=len(games) - 1)
+    game = (first + rng.integers(0, 4, n_rows)).clip(max=len(games) - 1)
+
+    sport = athlete_sport[athlete]
+    discipline = rng.integers(0, len(DISCIPLINES), n_rows)
+    sex = athlete_sex[athlete]
+    year = game_years[game]
+
+    event = [
+        f"{SPORTS[s]} {'Men' if x == 'M' else 'Women'}'s {DISCIPLINES[d]}"
+        for s, x, d in zip(sport, sex, discipline)
+    ]
+
+    nocs = regions['NOC'].to_numpy()
+    teams = regions['region'].fillna(regions['NOC']).to_numpy()
+
+    medal = rng.choice(np.array(['Gold', 'Silver', 'Bronze', '']), n_rows,
+                       p=[0.05, 0.05, 0.05, 0.85]).astype(object)
+    medal[medal == ''] = None
+
+    age = (year - athlete_birth[athlete]).astype(float)
+    height = athlete_height[athlete]
+    weight = athlete_weight[athlete]
+    age[rng.random(n_rows) < 0.03] = np.nan
+    height[rng.random(n_rows) < 0.2] = np.nan
+    weight[rng.random(n_rows) < 0.2] = np.nan
+
+    names = np.array([f'Athlete {i:07d}' for i in range(n_athletes)], dtype=object)
+    seasons = np.array([g[1] for g in games], dtype=object)
+    cities = np.array([g[2] for g in games], dtype=object)
+
+    df = pd.DataFrame({
+        'ID': athlete + 1,
+        'Name': names[athlete],
+        'Sex': sex,
+        'Age': age,
+        'Height': height,
+        'Weight': weight,
+        'Team': teams[athlete_noc[athlete]],
+        'NOC': nocs[athlete_noc[athlete]],
+        'Games': [f'{y} {s}' for y, s in zip(year, seasons[game])],
+        'Year': year,
+        'Season': seasons[game],
+        'City': cities[game],
+        'Sport': np.array(SPORTS, dtype=object)[sport],
+        'Event': event,
+        'Medal': medal,
+    })
+
+    winter_mismatch = df['Season'].eq('Winter') != df['Sport'].isin(WINTER_SPORTS)
+    df.loc[winter_mismatch & (rng.random(n_rows) < 0.9), 'Season'] = 'Summer'
+    df['Games'] = df['Year'].astype(str) + ' ' + df['Season']
+
+    return df[COLUMNS]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write a synthetic athlete_events.csv')
+    parser.add_argument('rows', type=int, help='number of rows to generate')
+    parser.add_argument('output', help='CSV file to write')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    make_athlete_events(args.rows, args.seed).to_csv(args.output, index=False)
+    print(f'Wrote {args.rows} rows to {args.output}')
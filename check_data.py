@@ -1,15 +1,20 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-df = pd.read_csv('data/athlete_events.csv')
-df = df[['Age', 'Height', 'Weight', 'Sex', 'Sport', 'Event', 'Team', 'Year', 'Medal']].copy()
-df['Medal'] = (~df['Medal'].isna()).astype(int)
-df = df.dropna(subset=['Age', 'Height', 'Weight', 'Sex', 'Sport', 'Event', 'Team', 'Year'])
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from profiler import load_profile
 
-print(f'Data shape after cleaning: {df.shape}')
-print(f'Unique Sports: {df["Sport"].nunique()}')
-print(f'Unique Events: {df["Event"].nunique()}')
-print(f'Unique Teams: {df["Team"].nunique()}')
+FEATURE_COLUMNS = ['Age', 'Height', 'Weight', 'Sex', 'Sport', 'Event', 'Team', 'Year']
+
+# One streaming pass over the CSV (cached per dataset version) instead of loading it whole
+profile = load_profile(required=FEATURE_COLUMNS)
+columns = profile['complete']['columns']
+
+print(f'Data shape after cleaning: ({profile["complete"]["rows"]}, {len(FEATURE_COLUMNS) + 1})')
+print(f'Unique Sports: {columns["Sport"]["distinct"]}')
+print(f'Unique Events: {columns["Event"]["distinct"]}')
+print(f'Unique Teams: {columns["Team"]["distinct"]}')
 
 # Estimate features after one-hot encoding
-approx_features = 1 + 1 + 1 + 1 + (df["Sex"].nunique()-1) + (df["Sport"].nunique()-1) + (df["Event"].nunique()-1) + (df["Team"].nunique()-1)
+approx_features = 1 + 1 + 1 + 1 + (columns["Sex"]["distinct"]-1) + (columns["Sport"]["distinct"]-1) + (columns["Event"]["distinct"]-1) + (columns["Team"]["distinct"]-1)
 print(f'Approximately {approx_features} features after one-hot encoding')
@@ -2,41 +2,87 @@ import streamlit as st
 import pandas as pd
 import sys
 from pathlib import Path
-import pickle
 import numpy as np
 
 # Setup path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
-from predict import predict, load_model
+import metrics
+from artifact import is_artifact
+import jobs
+import whatif
+from predict import load_artifact
+from dataset import dataset_version, load_event_index
 
 st.set_page_config(page_title="Medal Prediction", layout="wide")
+metrics.serve_from_env()
 
 st.title("🥇 Medal Prediction")
 st.write("Predict whether an athlete will win a medal based on their characteristics and event details")
 
 # Load model
-@st.cache_resource
+# The directory artifact opens from its JSON header; the forest arrays are
+# memory-mapped on the first prediction. Fall back to the pickle.
+models_dir = Path(__file__).parent.parent / 'models'
+model_path = models_dir / 'model' if is_artifact(models_dir / 'model') else models_dir / 'model.pkl'
+
+@metrics.cached('prediction.get_model', st.cache_resource)
 def get_model():
-    model_path = Path(__file__).parent.parent / 'models' / 'model.pkl'
     try:
-        model, features, top_sports, top_events, top_teams = load_model(str(model_path))
-        return model, features, top_sports, top_events, top_teams
+        return load_artifact(str(model_path))
     except FileNotFoundError:
         st.error("❌ Model file not found. Please train the model first using `python src/train.py`")
-        return None, None, None, None, None
+        return None
 
-model, features, top_sports, top_events, top_teams = get_model()
+artifact = get_model()
 
-if model is None:
+if artifact is None:
     st.stop()
 
-# Load data for reference
+encoder, features = artifact['encoder'], artifact['features']
+top_sports, top_events, top_teams = (artifact.get('top_sports', []), artifact.get('top_events', []),
+                                     artifact.get('top_teams', []))
+
+# Dropdown options: events per sport and teams, from a small precomputed index
+@metrics.cached('prediction.load_reference_index', st.cache_data)
+def load_reference_index(version):
+    return load_event_index()
+
+ref_index = load_reference_index(dataset_version())
+
+required_cols = ['Age', 'Height', 'Weight', 'Sex', 'Sport', 'Event', 'Team', 'Year']
+
+# Single predictions behind an LRU keyed by the encoded row, shared by all sessions
+@st.cache_resource
+def get_scorer():
+    return whatif.CachedScorer(artifact['engine'])
+
+# Batch scoring jobs: one worker pool per server process, shared by all sessions
+@st.cache_resource
+def job_manager():
+    return jobs.JobManager(model_path)
+
 @st.cache_data
-def load_reference_data():
-    df = pd.read_csv(Path(__file__).parent.parent / 'data' / 'athlete_events.csv')
-    return df
+def model_version(path):
+    return jobs.model_version(path)
+
+@st.cache_data(max_entries=16)
+def job_results(job_key):
+    # Keyed by the upload and model hashes, so downloads never rescore
+    job = job_manager().get(job_key)
+    labels, probabilities = job.result()
+    results_df = job.input[required_cols].reset_index(drop=True)
+    results_df['Medal_Predicted'] = np.where(labels == 1, 'Yes', 'No')
+    results_df['Medal_Probability'] = [f"{prob*100:.1f}%" for prob in probabilities]
+    return results_df, results_df.to_csv(index=False)
 
-df_ref = load_reference_data()
+def show_progress(job_key):
+    job = job_manager().get(job_key)
+    if not job.running:
+        st.rerun()
+    st.progress(job.progress, text=f"Scoring... {job.rows_done:,} of {job.rows:,} rows")
+    if st.button("Cancel"):
+        job.cancel()
+        st.rerun()
 
 # Input options
 st.sidebar.header("Input Method")
@@ -48,51 +94,43 @@ if input_method == "Manual Entry":
     col1, col2 = st.columns(2)
     
     with col1:
-        age = st.slider("Age", min_value=10, max_value=80, value=25)
-        height = st.slider("Height (cm)", min_value=140, max_value=230, value=175)
-        weight = st.slider("Weight (kg)", min_value=40, max_value=200, value=70)
+        age = st.slider("Age", *whatif.RANGES['Age'][:2], value=25)
+        height = st.slider("Height (cm)", *whatif.RANGES['Height'][:2], value=175)
+        weight = st.slider("Weight (kg)", *whatif.RANGES['Weight'][:2], value=70)
         sex = st.selectbox("Sex", options=["M", "F"])
     
     with col2:
-        sport_options = list(top_sports) if top_sports else sorted(df_ref['Sport'].unique())
+        sport_options = list(top_sports) if top_sports else sorted(ref_index['events'])
         sport = st.selectbox("Sport", options=sport_options)
         
-        event_options = sorted(df_ref[df_ref['Sport'] == sport]['Event'].unique())
+        event_options = ref_index['events'].get(sport, [])
         if top_events:
             event_options = [e for e in event_options if e in top_events]
         event = st.selectbox("Event", options=event_options if event_options else ['N/A'])
         
-        team_options = list(top_teams) if top_teams else sorted(df_ref['Team'].unique())
+        team_options = list(top_teams) if top_teams else ref_index['teams']
         team = st.selectbox("Team/Country", options=team_options)
-        year = st.slider("Year", min_value=1896, max_value=2024, value=2024, step=4)
+        year_min, year_max, year_step = whatif.RANGES['Year']
+        year = st.slider("Year", min_value=year_min, max_value=year_max, value=2024, step=year_step)
+
+    record = {'Age': age, 'Height': height, 'Weight': weight, 'Sex': sex, 'Sport': sport, 'Event': event,
+              'Team': team, 'Year': year}
     
     if st.button("Predict Medal", type="primary"):
         # Create input dataframe
-        input_data = pd.DataFrame({
-            'Age': [age],
-            'Height': [height],
-            'Weight': [weight],
-            'Sex': [sex],
-            'Sport': [sport],
-            'Event': [event],
-            'Team': [team],
-            'Year': [year]
-        })
-        
-        # One-hot encode
-        input_encoded = pd.get_dummies(input_data, columns=['Sex', 'Sport', 'Event', 'Team'], drop_first=True)
-        
-        # Ensure all features match
-        for col in features:
-            if col not in input_encoded.columns:
-                input_encoded[col] = 0
+        input_data = pd.DataFrame({col: [value] for col, value in record.items()})
         
-        input_encoded = input_encoded[features]
+        # Encode straight into the training feature layout
+        input_encoded = encoder.transform_one(record)
         
         # Predict
         try:
-            prediction = model.predict(input_encoded)[0]
-            probability = model.predict_proba(input_encoded)[0, 1]
+            # The compiled forest scores identically to the sklearn model, with far less
+            # overhead; repeated inputs are answered from the scorer's cache
+            model = get_scorer()
+            proba = model.predict_proba(input_encoded)[0]
+            prediction = model.classes_[proba.argmax()]
+            probability = proba[1]
             
             st.divider()
             st.subheader("🎯 Prediction Result")
@@ -113,6 +151,30 @@ if input_method == "Manual Entry":
         except Exception as e:
             st.error(f"⚠️ The selected combination is not in the model's training data. Please choose different values.\nError: {str(e)}")
 
+    # What-if sweep: the whole grid is encoded as one matrix and scored in one call
+    st.divider()
+    st.subheader("📈 What-if Sweep")
+    sweep = st.selectbox("Vary", ['None'] + list(whatif.SWEEPS),
+                         help="Medal probability over the full range of one or two inputs, the others as entered above")
+
+    if sweep != 'None':
+        import plotly.express as px
+
+        axes = whatif.sweep_axes(sweep, team_options)
+        grid = whatif.score_sweep(artifact['engine'], encoder, record, axes)
+
+        if len(axes) == 2:
+            x_col, y_col = axes
+            surface = grid.pivot(index=y_col, columns=x_col, values='Probability')
+            fig = px.imshow(surface, origin='lower', aspect='auto', color_continuous_scale='Viridis',
+                            labels={'color': 'Medal probability'})
+        elif sweep == 'Team':
+            fig = px.bar(grid.sort_values('Probability', ascending=False), x='Team', y='Probability')
+        else:
+            fig = px.line(grid, x=sweep, y='Probability', markers=True)
+            fig.add_vline(x=record[sweep], line_dash='dash')
+        st.plotly_chart(fig)
+
 else:  # Upload CSV
     st.subheader("Upload CSV File")
     
@@ -124,49 +186,38 @@ else:  # Upload CSV
         st.write("**Preview of uploaded data:**")
         st.dataframe(input_df.head(10), width='stretch')
         
-        required_cols = ['Age', 'Height', 'Weight', 'Sex', 'Sport', 'Event', 'Team', 'Year']
         missing_cols = [col for col in required_cols if col not in input_df.columns]
         
         if missing_cols:
             st.error(f"Missing required columns: {', '.join(missing_cols)}")
         else:
-            if st.button("Predict on All Records", type="primary"):
-                try:
-                    # Process predictions
-                    results = []
-                    for idx, row in input_df.iterrows():
-                        data_point = pd.DataFrame([row[required_cols]])
-                        data_encoded = pd.get_dummies(data_point, columns=['Sex', 'Sport', 'Event', 'Team'], drop_first=True)
-                        
-                        for col in features:
-                            if col not in data_encoded.columns:
-                                data_encoded[col] = 0
-                        
-                        data_encoded = data_encoded[features]
-                        
-                        pred = model.predict(data_encoded)[0]
-                        prob = model.predict_proba(data_encoded)[0, 1]
-                        
-                        results.append({
-                            **row[required_cols].to_dict(),
-                            'Medal_Predicted': 'Yes' if pred == 1 else 'No',
-                            'Medal_Probability': f"{prob*100:.1f}%"
-                        })
-                    
-                    results_df = pd.DataFrame(results)
-                    st.success("✅ Predictions complete!")
-                    st.dataframe(results_df, width='stretch')
-                    
-                    # Download results
-                    csv = results_df.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Download Predictions",
-                        data=csv,
-                        file_name="medal_predictions.csv",
-                        mime="text/csv"
-                    )
-                except Exception as e:
-                    st.error(f"Error during prediction: {str(e)}")
+            # Jobs run in a worker pool and outlive reruns; the script only polls them
+            job_key = jobs.upload_key(uploaded_file.getvalue(), model_version(str(model_path)))
+            job = job_manager().get(job_key)
+
+            if job is None or job.state in (jobs.CANCELLED, jobs.FAILED):
+                if job is not None and job.state == jobs.FAILED:
+                    st.error(f"Error during prediction: {job.error}")
+                elif job is not None:
+                    st.warning(f"Cancelled after {job.rows_done:,} of {job.rows:,} rows")
+                if st.button("Predict on All Records", type="primary"):
+                    job_manager().submit(job_key, input_df[required_cols])
+                    st.rerun()
+            elif job.running:
+                st.fragment(run_every=0.5)(show_progress)(job_key)
+            else:
+                results_df, csv = job_results(job_key)
+
+                st.success(f"✅ Predictions complete! ({job.rows:,} rows in {job.elapsed:.1f}s)")
+                st.dataframe(results_df, width='stretch')
+
+                # Download results
+                st.download_button(
+                    label="📥 Download Predictions",
+                    data=csv,
+                    file_name="medal_predictions.csv",
+                    mime="text/csv"
+                )
 
 # Model info
 st.divider()
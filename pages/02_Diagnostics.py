@@ -0,0 +1,66 @@
+import streamlit as st
+import pandas as pd
+import os
+import sys
+from pathlib import Path
+
+# Setup path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+import metrics
+
+st.set_page_config(page_title="Diagnostics", layout="wide")
+metrics.serve_from_env()
+
+st.title("🩺 Diagnostics")
+st.write("Timings, rows processed and cache hit rates of the data and prediction paths in this server process")
+
+# ---------------- CONTROLS ----------------
+st.sidebar.header("Instrumentation")
+recording = st.sidebar.toggle("Record metrics", value=metrics.enabled())
+if recording != metrics.enabled():
+    metrics.enable(recording)
+if st.sidebar.button("Reset counters"):
+    metrics.reset()
+
+data = metrics.snapshot()
+port = os.environ.get('OLYMPICS_METRICS_PORT')
+if port:
+    st.sidebar.write(f"Endpoint: `http://127.0.0.1:{port}/metrics` and `/metrics.json`")
+else:
+    st.sidebar.write("Set `OLYMPICS_METRICS_PORT` to expose `/metrics` for Prometheus")
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Instrumented functions", len(data['functions']))
+col2.metric("Calls recorded", sum(stat['calls'] for stat in data['functions'].values()))
+peak_rss = data['peak_rss_bytes']
+col3.metric("Peak RSS", f"{peak_rss / 2**20:,.0f} MB" if peak_rss is not None else "n/a")
+
+if not data['functions']:
+    st.info("Nothing recorded yet. Open the analysis or prediction pages, then come back.")
+    st.stop()
+
+# ---------------- SUMMARY ----------------
+st.subheader("Hot paths")
+summary = pd.DataFrame.from_dict(data['functions'], orient='index').drop(columns='buckets')
+summary['rows_per_s'] = summary['rows'] / (summary['total_ms'] / 1e3)
+summary['peak_mb'] = summary['peak_bytes'] / 2**20
+columns = ['calls', 'errors', 'mean_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms', 'total_ms', 'rows', 'rows_per_s',
+           'cache_hit_rate']
+if data['tracing_memory']:
+    columns.append('peak_mb')
+else:
+    st.caption("Per-call peak memory needs tracemalloc: start the server with `OLYMPICS_METRICS_MEMORY=1`.")
+st.dataframe(summary[columns].sort_values('total_ms', ascending=False), width='stretch')
+
+# ---------------- LATENCY HISTOGRAM ----------------
+st.subheader("Latency histogram")
+name = st.selectbox("Function", summary.sort_values('total_ms', ascending=False).index)
+buckets = pd.Series(data['functions'][name]['buckets'], name='calls')
+buckets.index = [f"≤ {bound} ms" for bound in buckets.index]
+st.bar_chart(buckets)
+
+# ---------------- EXPORT ----------------
+st.subheader("Export")
+col1, col2 = st.columns(2)
+col1.download_button("📥 JSON", metrics.to_json(), file_name="metrics.json", mime="application/json")
+col2.download_button("📥 Prometheus text", metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain")
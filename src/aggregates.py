@@ -0,0 +1,116 @@
+"""Precomputed aggregates for the Overall Analysis page.
+
+The headline metrics, the participation-over-time series and the Sport x Year
+events pivot depend only on the dataset, never on user input. They are
+computed once and pickled to data/.cache under a name that carries the hashes
+of athlete_events.csv and noc_regions.csv, so a changed dataset is picked up
+automatically and stale files are removed.
+
+Run ahead of time (the Docker image does this at build time):
+
+    python src/aggregates.py
+
+Otherwise the first app start builds them.
+"""
+
+import argparse
+import os
+import pickle
+import time
+
+import helper
+import preprocessor
+from dataset import (ATHLETE_EVENTS_PATH, CACHE_DIR, NOC_REGIONS_PATH, dataset_version,
+                     load_athlete_events, load_regions)
+
+# Bump when the stored layout or the computation changes
+FORMAT_VERSION = 1
+
+METRICS = [
+    ('Editions', 'Year'),
+    ('Hosts', 'City'),
+    ('Sports', 'Sport'),
+    ('Events', 'Event'),
+    ('Nations', 'region'),
+    ('Athletes', 'Name'),
+]
+OVER_TIME_COLUMNS = ['region', 'Event', 'Name']
+
+
+def events_pivot(df):
+    # Number of distinct events per sport and edition
+    temp = df.drop_duplicates(['Year', 'Sport', 'Event'])
+    return temp.pivot_table(index='Sport', columns='Year', values='Event', aggfunc='count', observed=True).fillna(0)
+
+
+def compute_overall(df) -> dict:
+    """Compute every Overall Analysis aggregate from the preprocessed frame."""
+    return {
+        'metrics': {label: int(df[col].nunique()) for label, col in METRICS},
+        'over_time': {col: helper.data_over_time(df, col) for col in OVER_TIME_COLUMNS},
+        'events_pivot': events_pivot(df),
+        'sports': sorted(df['Sport'].dropna().unique()),
+    }
+
+
+def aggregates_version(athletes_path=None, regions_path=None) -> str:
+    athletes = dataset_version(athletes_path or ATHLETE_EVENTS_PATH)
+    regions = dataset_version(regions_path or NOC_REGIONS_PATH)
+    return f'v{FORMAT_VERSION}-{athletes}-{regions}'
+
+
+def _aggregates_file(version: str):
+    return CACHE_DIR / f'overall-{version}.pkl'
+
+
+def _write(aggregates: dict, path):
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(aggregates, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, path)
+    except OSError:
+        # Read-only checkout: the aggregates are still returned, just not kept
+        return
+
+    for stale in CACHE_DIR.glob('overall-*.pkl'):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+def load_overall(df=None, version=None) -> dict:
+    """
+    Return the Overall Analysis aggregates, computing and storing them if needed.
+
+    ``df`` is the preprocessed frame; it is only used (or loaded) when no
+    stored aggregates exist for the current dataset.
+    """
+    path = _aggregates_file(version or aggregates_version())
+    if path.exists():
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+
+    if df is None:
+        df = preprocessor.preprocess(load_athlete_events(), load_regions(), compact=True)
+    aggregates = compute_overall(df)
+    _write(aggregates, path)
+    return aggregates
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute the Overall Analysis aggregates")
+    parser.add_argument('--force', action='store_true', help="recompute even if stored aggregates exist")
+    args = parser.parse_args()
+
+    path = _aggregates_file(aggregates_version())
+    if args.force:
+        path.unlink(missing_ok=True)
+
+    start = time.perf_counter()
+    aggregates = load_overall()
+    print(f"Aggregates ready at {path} ({time.perf_counter() - start:.2f}s)")
+    print(', '.join(f'{label}: {value}' for label, value in aggregates['metrics'].items()))
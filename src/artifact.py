@@ -0,0 +1,142 @@
+"""Directory model artifact with a JSON header and memory-mapped tree arrays.
+
+Layout of ``models/model/``::
+
+    meta.json        features, top categories, encoder baselines, forest depth
+    arrays-<id>/     one .npy file per CompiledForest node array
+
+Opening an artifact only parses ``meta.json``; the forest is mapped from the
+.npy files on the first prediction. Read-only mappings of the same files are
+backed by one copy in the OS page cache, so several server processes share it.
+
+Convert a pickled bundle (train.py writes both formats):
+
+    python src/artifact.py --model models/model.pkl --output models/model
+"""
+
+import argparse
+import json
+import os
+import pickle
+import shutil
+import threading
+import uuid
+from pathlib import Path
+
+from encoder import FeatureEncoder
+from forest import CompiledForest
+
+FORMAT_VERSION = 1
+MODEL_DIR = Path(__file__).parent.parent / 'models' / 'model'
+
+METADATA_KEYS = ['features', 'categorical_features', 'top_sports', 'top_events', 'top_teams', 'n_samples']
+
+
+def save_artifact(bundle: dict, directory):
+    """Write a trained bundle (as produced by train.train) in the directory format."""
+    directory = Path(directory)
+    engine = bundle.get('engine') or CompiledForest.from_sklearn(bundle['model'])
+    encoder = FeatureEncoder.from_bundle(bundle)
+
+    # A fresh arrays directory per save: processes that mapped the previous
+    # arrays keep reading them until they reopen the artifact
+    arrays = f'arrays-{uuid.uuid4().hex[:12]}'
+    engine.save_arrays(directory / arrays)
+    meta = {
+        'format_version': FORMAT_VERSION,
+        **{key: list(bundle[key]) if key != 'n_samples' else int(bundle[key])
+           for key in METADATA_KEYS if key in bundle},
+        'encoder': {
+            'numeric': encoder.numeric,
+            'categorical': encoder.categorical,
+            'baselines': encoder.baselines,
+        },
+        'forest': {'depth': engine.depth, 'n_trees': engine.n_trees, 'n_nodes': engine.n_nodes},
+        'arrays': arrays,
+    }
+
+    # The header goes last and atomically, so readers never see it ahead of the arrays
+    tmp_file = directory / 'meta.json.tmp'
+    tmp_file.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp_file, directory / 'meta.json')
+
+    # Unlinked files stay readable through existing mappings
+    for old in directory.iterdir():
+        if old.is_dir() and old.name.startswith('arrays') and old.name != arrays:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+class ModelArtifact:
+    """
+    A model opened from the directory format.
+
+    Supports the same lookups as the dict returned by ``predict.load_artifact``
+    (``artifact['features']``, ``artifact.get('top_sports')``,
+    ``artifact['engine']``), except for the sklearn ``'model'``, which this
+    format does not store.
+    """
+
+    def __init__(self, directory=MODEL_DIR, mmap_mode='r'):
+        self.directory = Path(directory)
+        self.mmap_mode = mmap_mode
+        self.meta = json.loads((self.directory / 'meta.json').read_text())
+        if self.meta.get('format_version', 0) > FORMAT_VERSION:
+            raise ValueError(f"{self.directory} uses artifact format "
+                             f"{self.meta['format_version']}, newer than this code supports")
+
+        encoder = self.meta['encoder']
+        self.encoder = FeatureEncoder(self.meta['features'], encoder['numeric'], encoder['categorical'],
+                                      encoder['baselines'])
+        self._engine = None
+        self._lock = threading.Lock()
+
+    @property
+    def features(self) -> list:
+        return self.meta['features']
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the forest arrays have been mapped yet."""
+        return self._engine is not None
+
+    @property
+    def engine(self) -> CompiledForest:
+        """The compiled forest, mapped from disk on first access."""
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = CompiledForest.load_arrays(
+                        self.directory / self.meta.get('arrays', 'arrays'), self.meta['forest']['depth'],
+                        self.mmap_mode)
+        return self._engine
+
+    def __getitem__(self, key):
+        if key == 'engine':
+            return self.engine
+        if key == 'encoder':
+            return self.encoder
+        return self.meta[key]
+
+    def __contains__(self, key):
+        return key in ('engine', 'encoder') or key in self.meta
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
+def is_artifact(path) -> bool:
+    return (Path(path) / 'meta.json').is_file()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert a pickled model bundle to the directory artifact")
+    parser.add_argument('--model', default=str(Path('models') / 'model.pkl'))
+    parser.add_argument('--output', default=str(Path('models') / 'model'))
+    args = parser.parse_args()
+
+    with open(args.model, 'rb') as f:
+        bundle = pickle.load(f)
+    save_artifact(bundle, args.output)
+    artifact = ModelArtifact(args.output)
+    print(f"Wrote {args.output}: {len(artifact.features)} features, "
+          f"{artifact.meta['forest']['n_trees']} trees, {artifact.meta['forest']['n_nodes']} nodes")
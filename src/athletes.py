@@ -0,0 +1,181 @@
+"""Athlete search index and per-athlete profiles.
+
+Built once per dataset. Rows are ordered by athlete ID (then Year), so every
+athlete's rows are one contiguous range of that order, and a profile is a
+single ``take``. Names are found in two ways:
+
+* prefix: a sorted list of the normalised name, and of the name from each
+  later word onward, so that "phel", "michael ph" and "fred phelps" all
+  match "Michael Fred Phelps";
+* fuzzy: trigram postings ranked by Jaccard similarity, for misspellings
+  ("micheal phelps"). These are built on the first fuzzy lookup.
+
+    index = AthleteIndex(df)
+    index.search('phelps')          # ID, Name, region, Games, medals...
+    index.profile(athlete_id)       # every row of that athlete
+"""
+
+import bisect
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+PROFILE_COLUMNS = ['Games', 'Year', 'City', 'Sport', 'Event', 'Team', 'Age', 'Height', 'Weight', 'Medal']
+SUMMARY_COLUMNS = ['ID', 'Name', 'Sex', 'region', 'Sport', 'First', 'Last', 'Games', 'Events',
+                   'Gold', 'Silver', 'Bronze']
+
+
+def normalize(text: str) -> str:
+    """Lower-case, accent-free, single-spaced form used for matching."""
+    text = str(text)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.casefold().split())
+
+
+def trigram_codes(names, chunk_size=50_000):
+    """
+    Distinct trigrams of each name as integers: ``(owners, codes)`` arrays.
+
+    Names are padded like ``'  name '``, so word starts weigh more. The three
+    code points of a trigram are packed into one int64, 21 bits each, and
+    names are processed in chunks to bound the fixed-width buffers.
+    """
+    owners, codes = [], []
+    for start in range(0, len(names), chunk_size):
+        chunk = [f'  {name} ' for name in names[start:start + chunk_size]]
+        width = max(map(len, chunk), default=3)
+        chars = np.array(chunk, dtype=f'<U{width}').view(np.uint32).reshape(len(chunk), width).astype(np.int64)
+        grams = (chars[:, :-2] << 42) | (chars[:, 1:-1] << 21) | chars[:, 2:]
+        valid = np.arange(width - 2) < np.fromiter(map(len, chunk), dtype=np.int64, count=len(chunk))[:, None] - 2
+        owners.append(np.broadcast_to(np.arange(start, start + len(chunk))[:, None], grams.shape)[valid])
+        codes.append(grams[valid])
+    owners = np.concatenate(owners) if owners else np.empty(0, dtype=np.int64)
+    codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.int64)
+
+    # Drop trigrams repeated within a name
+    order = np.lexsort((codes, owners))
+    owners, codes = owners[order], codes[order]
+    distinct = np.r_[True, (owners[1:] != owners[:-1]) | (codes[1:] != codes[:-1])]
+    return owners[distinct], codes[distinct]
+
+
+def _first_values(series: pd.Series, rows: np.ndarray) -> np.ndarray:
+    return np.asarray(series.take(rows), dtype=object)
+
+
+class AthleteIndex:
+    """Row ranges, summaries and name lookups for every athlete in ``df``."""
+
+    @metrics.timed('athletes.AthleteIndex.build')
+    def __init__(self, df: pd.DataFrame):
+        # Selected once: taking rows from 10 columns is much cheaper than from the full frame
+        self._profiles = df[PROFILE_COLUMNS]
+        ids = df['ID'].to_numpy()
+        years = df['Year'].to_numpy()
+        self._order = np.lexsort((years, ids))
+        sorted_ids = ids[self._order]
+        sorted_years = years[self._order]
+
+        new_athlete = np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]
+        starts = np.flatnonzero(new_athlete)
+        self._offsets = np.r_[starts, len(ids)]
+        self._position = {athlete_id: i for i, athlete_id in enumerate(sorted_ids[starts].tolist())}
+
+        first_rows = self._order[starts]
+        new_games = new_athlete | np.r_[True, sorted_years[1:] != sorted_years[:-1]]
+        summary = {
+            'ID': sorted_ids[starts],
+            'Name': _first_values(df['Name'], first_rows),
+            'Sex': _first_values(df['Sex'], first_rows),
+            'region': _first_values(df['region'], first_rows),
+            'Sport': _first_values(df['Sport'], first_rows),
+            'First': sorted_years[starts],
+            'Last': sorted_years[self._offsets[1:] - 1],
+            'Games': np.add.reduceat(new_games.astype(np.int32), starts),
+            'Events': np.diff(self._offsets),
+        }
+        for medal in ['Gold', 'Silver', 'Bronze']:
+            summary[medal] = np.add.reduceat(df[medal].to_numpy(np.int32)[self._order], starts)
+        self.summary = pd.DataFrame(summary, columns=SUMMARY_COLUMNS)
+
+        self._names = [normalize(name) for name in self.summary['Name']]
+        keys = []
+        for i, name in enumerate(self._names):
+            words = name.split(' ')
+            keys += [(' '.join(words[j:]), i) for j in range(len(words))]
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._key_athletes = np.array([i for _, i in keys], dtype=np.int64)
+
+        self._trigram_lock = threading.Lock()
+        self._postings = None
+
+    def __len__(self) -> int:
+        return len(self.summary)
+
+    def prefix(self, query: str, limit=20) -> np.ndarray:
+        """Positions of athletes whose name, or the name from any word onward, starts with ``query``."""
+        query = normalize(query)
+        if not query:
+            return np.empty(0, dtype=np.int64)
+        lo = bisect.bisect_left(self._keys, query)
+        hi = bisect.bisect_left(self._keys, query + '\U0010ffff')
+        # One athlete can match through several of its keys
+        matches = pd.unique(self._key_athletes[lo:hi])
+        return matches[:limit]
+
+    def _build_trigrams(self):
+        owners, codes = trigram_codes(self._names)
+        vocabulary, gram_ids = np.unique(codes, return_inverse=True)
+        order = np.argsort(gram_ids, kind='stable')
+        offsets = np.searchsorted(gram_ids[order], np.arange(len(vocabulary) + 1))
+        sizes = np.bincount(owners, minlength=len(self._names))
+        return vocabulary, owners[order], offsets, sizes
+
+    def fuzzy(self, query: str, limit=20, min_similarity=0.3) -> np.ndarray:
+        """Positions of the athletes whose names share the most trigrams with ``query``."""
+        query = normalize(query)
+        if not query:
+            return np.empty(0, dtype=np.int64)
+        with self._trigram_lock:
+            if self._postings is None:
+                self._postings = self._build_trigrams()
+        vocabulary, owners, offsets, sizes = self._postings
+
+        query_codes = trigram_codes([query])[1]
+        gram_ids = np.searchsorted(vocabulary, query_codes).clip(max=len(vocabulary) - 1)
+        gram_ids = gram_ids[vocabulary[gram_ids] == query_codes]
+        if not len(gram_ids):
+            return np.empty(0, dtype=np.int64)
+        hits = np.concatenate([owners[offsets[g]:offsets[g + 1]] for g in gram_ids])
+        shared = np.bincount(hits, minlength=len(sizes))
+        candidates = np.flatnonzero(shared)
+        similarity = shared[candidates] / (len(query_codes) + sizes[candidates] - shared[candidates])
+        keep = similarity >= min_similarity
+        candidates, similarity = candidates[keep], similarity[keep]
+        best = np.argsort(-similarity, kind='stable')[:limit]
+        return candidates[best]
+
+    @metrics.timed('athletes.AthleteIndex.search', rows=lambda args, result: len(result))
+    def search(self, query: str, limit=20) -> pd.DataFrame:
+        """Prefix matches first, topped up with fuzzy matches; one summary row per athlete."""
+        found = self.prefix(query, limit)
+        if len(found) < limit:
+            extra = self.fuzzy(query, limit)
+            found = np.concatenate([found, extra[~np.isin(extra, found)]])[:limit]
+        return self.summary.iloc[found].reset_index(drop=True)
+
+    @metrics.timed('athletes.AthleteIndex.profile', rows='result')
+    def profile(self, athlete_id) -> pd.DataFrame:
+        """Every row of one athlete, by Year; empty if the ID is unknown."""
+        i = self._position.get(athlete_id)
+        if i is None:
+            return self._profiles.iloc[:0]
+        rows = self._order[self._offsets[i]:self._offsets[i + 1]]
+        return self._profiles.take(rows).reset_index(drop=True)
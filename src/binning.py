@@ -0,0 +1,89 @@
+"""NumPy binning for the athlete analysis charts.
+
+Large scatter plots and histograms are reduced to per-class counts on a fixed
+grid before they reach Plotly or seaborn, so render time and payload depend
+on the number of bins rather than the number of athletes. Small selections
+(``EXACT_POINTS_LIMIT`` rows or fewer) are still plotted point by point.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Selections up to this many athletes are drawn as individual points
+EXACT_POINTS_LIMIT = 5_000
+
+
+def _class_codes(df: pd.DataFrame, by, missing):
+    """Integer code per row for the combination of the ``by`` columns, and the code labels."""
+    codes = np.zeros(len(df), dtype=np.intp)
+    levels = []
+    for col in by:
+        col_codes, labels = pd.factorize(df[col].astype(object).fillna(missing), sort=True)
+        codes = codes * len(labels) + col_codes
+        levels.append(labels)
+    return codes, pd.MultiIndex.from_product(levels, names=by).to_frame(index=False)
+
+
+def _bin_index(values: np.ndarray, start: float, width: float, n_bins: int) -> np.ndarray:
+    return np.minimum(((values - start) // width).astype(np.intp), n_bins - 1)
+
+
+def histogram_by_class(df: pd.DataFrame, column: str, by='Medal', bin_width=1.0, missing='No Medal') -> pd.DataFrame:
+    """
+    Counts of ``column`` in bins of ``bin_width``, per class of ``by``.
+
+    Returns one row per non-empty (class, bin) with the bin centre in
+    ``column`` and the number of rows in ``count``. Missing classes are
+    labelled ``missing``; missing values are skipped.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    codes, labels = _class_codes(df, by, missing)
+    keep = ~np.isnan(values)
+    values, codes = values[keep], codes[keep]
+    if not len(values):
+        return pd.DataFrame(columns=[*by, column, 'count'])
+
+    start = np.floor(values.min() / bin_width) * bin_width
+    n_bins = int((values.max() - start) // bin_width) + 1
+    counts = np.bincount(codes * n_bins + _bin_index(values, start, bin_width, n_bins),
+                         minlength=len(labels) * n_bins)
+
+    cells = np.flatnonzero(counts)
+    result = labels.iloc[cells // n_bins].reset_index(drop=True)
+    result[column] = start + (cells % n_bins + 0.5) * bin_width
+    result['count'] = counts[cells]
+    return result
+
+
+def grid_density(df: pd.DataFrame, x: str, y: str, by=('Medal', 'Sex'), bins=60, missing='No Medal') -> pd.DataFrame:
+    """
+    2D grid counts of (``x``, ``y``) per class combination of ``by``.
+
+    The ranges of ``x`` and ``y`` are split into ``bins`` equal cells each.
+    Returns one row per non-empty (class, cell) with the cell centre in ``x``
+    and ``y`` and the number of rows in ``count``. Rows missing either
+    coordinate are skipped.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    xs = df[x].to_numpy(dtype=np.float64, na_value=np.nan)
+    ys = df[y].to_numpy(dtype=np.float64, na_value=np.nan)
+    codes, labels = _class_codes(df, by, missing)
+    keep = ~(np.isnan(xs) | np.isnan(ys))
+    xs, ys, codes = xs[keep], ys[keep], codes[keep]
+    if not len(xs):
+        return pd.DataFrame(columns=[*by, x, y, 'count'])
+
+    x_start, y_start = xs.min(), ys.min()
+    # A degenerate (single-valued) range still gets one cell
+    x_width = (xs.max() - x_start) / bins or 1.0
+    y_width = (ys.max() - y_start) / bins or 1.0
+    cell = _bin_index(xs, x_start, x_width, bins) * bins + _bin_index(ys, y_start, y_width, bins)
+    counts = np.bincount(codes * bins * bins + cell, minlength=len(labels) * bins * bins)
+
+    cells = np.flatnonzero(counts)
+    result = labels.iloc[cells // (bins * bins)].reset_index(drop=True)
+    result[x] = x_start + ((cells // bins) % bins + 0.5) * x_width
+    result[y] = y_start + (cells % bins + 0.5) * y_width
+    result['count'] = counts[cells]
+    return result
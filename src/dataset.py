@@ -0,0 +1,176 @@
+"""Typed, cached loading of the Olympics dataset.
+
+athlete_events.csv is parsed once with compact dtypes (categoricals for the
+repeated string columns, narrow numerics for the measurements) and written to
+a Parquet file under data/.cache. The cache file name carries a hash of the
+source bytes, so editing or replacing the CSV invalidates it automatically.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+import metrics
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+CACHE_DIR = DATA_DIR / '.cache'
+
+ATHLETE_EVENTS_PATH = DATA_DIR / 'athlete_events.csv'
+NOC_REGIONS_PATH = DATA_DIR / 'noc_regions.csv'
+
+CATEGORICAL_COLUMNS = ['Sex', 'Team', 'NOC', 'Games', 'Season', 'City', 'Sport', 'Event', 'Medal']
+
+# Narrow dtypes of the integer columns. They are parsed as floats, so a row
+# with a missing ID or Year still loads, and narrowed once they have no gaps.
+INTEGER_COLUMNS = {'ID': 'int32', 'Year': 'int16'}
+
+DTYPES = {
+    'ID': 'float64',
+    'Age': 'float32',
+    'Height': 'float32',
+    'Weight': 'float32',
+    'Year': 'float64',
+    **{col: 'category' for col in CATEGORICAL_COLUMNS},
+}
+
+
+def file_hash(path, chunk_size=1 << 20) -> str:
+    """Return a short content hash of a file."""
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+_versions = {}
+
+
+def dataset_version(path=None) -> str:
+    """
+    Return the content hash of a data file.
+
+    The hash is only recomputed when the file's size or mtime changes, so
+    this is cheap enough to call on every Streamlit rerun as a cache key.
+    """
+    path = Path(path) if path else ATHLETE_EVENTS_PATH
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if key not in _versions:
+        _versions[key] = file_hash(path)
+    return _versions[key]
+
+
+def downcast_integers(df: pd.DataFrame) -> pd.DataFrame:
+    """Narrow float or nullable integer columns without missing values to their ``INTEGER_COLUMNS`` dtype."""
+    narrowed = {col: dtype for col, dtype in INTEGER_COLUMNS.items()
+                if col in df.columns and df[col].dtype != dtype and not df[col].isna().any()}
+    return df.astype(narrowed) if narrowed else df
+
+
+@metrics.timed(rows='result')
+def read_csv_typed(path, **kwargs) -> pd.DataFrame:
+    """
+    Parse an athlete_events-shaped CSV with the compact dtypes.
+
+    ID and Year stay floats only if some rows lack them; callers drop those
+    rows and narrow the rest with ``downcast_integers``. With ``chunksize``
+    (or ``iterator``), every chunk reads them as nullable ``Int32``/``Int16``
+    instead, so all chunks share one schema whichever of them have gaps.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {col: dtype for col, dtype in DTYPES.items() if col in header}
+    if kwargs.get('chunksize') or kwargs.get('iterator'):
+        dtypes.update({col: dtype.capitalize() for col, dtype in INTEGER_COLUMNS.items() if col in header})
+        return pd.read_csv(path, dtype=dtypes, **kwargs)
+    return downcast_integers(pd.read_csv(path, dtype=dtypes, **kwargs))
+
+
+def _cache_file(path: Path, digest: str, cache_dir: Path) -> Path:
+    return cache_dir / f'{path.stem}-{digest}.parquet'
+
+
+def _write_cache(df: pd.DataFrame, cache_file: Path):
+    """Write the Parquet cache atomically and drop stale versions of it."""
+    cache_dir = cache_file.parent
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        df.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, cache_file)
+    except (ImportError, OSError):
+        # No Parquet engine or a read-only data directory: serve from the CSV.
+        return
+
+    stem = cache_file.name.rsplit('-', 1)[0]
+    for stale in cache_dir.glob(f'{stem}-*.parquet'):
+        if stale != cache_file:
+            stale.unlink(missing_ok=True)
+
+
+@metrics.timed(rows='result')
+def load_athlete_events(path=None, columns=None, cache_dir=None) -> pd.DataFrame:
+    """
+    Load athlete_events.csv through the columnar cache.
+
+    The first call for a given file content parses the CSV and stores it as
+    Parquet; later calls read only the requested columns from the cache.
+    """
+    path = Path(path) if path else ATHLETE_EVENTS_PATH
+    cache_file = _cache_file(path, dataset_version(path), Path(cache_dir) if cache_dir else CACHE_DIR)
+
+    if cache_file.exists():
+        try:
+            return pd.read_parquet(cache_file, columns=columns)
+        except (ImportError, OSError, ValueError):
+            pass
+
+    df = read_csv_typed(path)
+    _write_cache(df, cache_file)
+
+    if columns is not None:
+        df = df[columns]
+    return df
+
+
+def load_event_index(path=None) -> dict:
+    """
+    Sports with their events, and all teams, for the prediction form's dropdowns.
+
+    Built once from the cached dataset and stored as a small JSON file next to
+    it, so the form never loads the dataset itself.
+    """
+    path = Path(path) if path else ATHLETE_EVENTS_PATH
+    index_file = CACHE_DIR / f'{path.stem}-events-{dataset_version(path)}.json'
+    if index_file.exists():
+        try:
+            return json.loads(index_file.read_text())
+        except (OSError, ValueError):
+            pass
+
+    df = load_athlete_events(path, columns=['Sport', 'Event', 'Team'])
+    pairs = df[['Sport', 'Event']].dropna().drop_duplicates().astype(str)
+    index = {
+        'events': {sport: sorted(events) for sport, events in pairs.groupby('Sport')['Event']},
+        'teams': sorted(df['Team'].dropna().astype(str).unique()),
+    }
+
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = index_file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(index))
+        os.replace(tmp_file, index_file)
+    except OSError:
+        return index
+    for stale in CACHE_DIR.glob(f'{path.stem}-events-*.json'):
+        if stale != index_file:
+            stale.unlink(missing_ok=True)
+    return index
+
+
+def load_regions(path=None) -> pd.DataFrame:
+    """Load the NOC → region mapping."""
+    return pd.read_csv(Path(path) if path else NOC_REGIONS_PATH)
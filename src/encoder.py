@@ -0,0 +1,178 @@
+"""Fitted one-hot encoder for the medal prediction features."""
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLUMNS = ['Age', 'Height', 'Weight', 'Year']
+CATEGORICAL_COLUMNS = ['Sex', 'Sport', 'Event', 'Team']
+
+
+class FeatureEncoder:
+    """
+    Maps raw athlete rows straight into the training feature matrix.
+
+    The encoder is defined by the ordered training feature names: numeric
+    columns are copied, and each ``<column>_<category>`` feature is set to 1
+    when the row has that category. Categories without a feature (the
+    ``drop_first`` baseline, or values never seen in training) encode as all
+    zeros, exactly like ``pd.get_dummies(..., drop_first=True)`` aligned to
+    the training columns.
+    """
+
+    def __init__(self, features, numeric=NUMERIC_COLUMNS, categorical=CATEGORICAL_COLUMNS,
+                 baselines=None):
+        self.features = list(features)
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self.baselines = dict(baselines or {})
+
+        position = {name: i for i, name in enumerate(self.features)}
+        self._numeric_positions = np.array([position[col] for col in self.numeric], dtype=np.intp)
+
+        # category -> feature position, per categorical column
+        self._index = {col: {} for col in self.categorical}
+        for name, i in position.items():
+            col, sep, category = name.partition('_')
+            if sep and col in self._index:
+                self._index[col][category] = i
+
+        self._categories = {col: pd.Index(list(index)) for col, index in self._index.items()}
+        self._positions = {col: np.fromiter(index.values(), dtype=np.intp, count=len(index))
+                           for col, index in self._index.items()}
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, numeric=NUMERIC_COLUMNS, categorical=CATEGORICAL_COLUMNS):
+        """Learn sorted category vocabularies, dropping the first as the baseline."""
+        features = list(numeric)
+        baselines = {}
+        for col in categorical:
+            values = sorted(df[col].dropna().unique())
+            if values:
+                baselines[col] = values[0]
+            features += [f'{col}_{value}' for value in values[1:]]
+        return cls(features, numeric, categorical, baselines)
+
+    @classmethod
+    def from_bundle(cls, bundle: dict) -> 'FeatureEncoder':
+        """
+        The bundle's fitted encoder, or one rebuilt from its feature names for
+        bundles saved before the encoder existed.
+
+        Those bundles don't record the ``drop_first`` baselines, and without
+        them ``extend`` would add the baselines back as new features. Each
+        baseline was the smallest category left after training filtered rows
+        by top sport, then event, then team. Many top categories did not
+        survive that filter, so the baseline is inferred as the smallest top
+        category without a feature that still co-occurs with the surviving
+        ones, and sorts before all of them:
+
+        * Sex: 'F' (only 'M' has a feature);
+        * Sport: a sport with a top event, since event names start with the sport;
+        * Event: an event of a surviving sport (featured or baseline);
+        * Team: teams carry no such link, so any top team qualifies.
+
+        This is a reconstruction, not a record. If no category qualifies, the
+        column gets no baseline, and its training baseline would come back as
+        a new feature on the first update.
+        """
+        if bundle.get('encoder') is not None:
+            return bundle['encoder']
+        encoder = cls(bundle['features'])
+        featured = encoder._index
+        top_events = bundle.get('top_events') or []
+
+        def baseline(col, categories, co_occurs=lambda category: True):
+            below = min(featured[col], default=None)
+            candidates = [category for category in categories or []
+                          if category not in featured[col] and (below is None or category < below)
+                          and co_occurs(category)]
+            return min(candidates, default=None)
+
+        baselines = {
+            'Sex': baseline('Sex', ['F', 'M']),
+            'Sport': baseline('Sport', bundle.get('top_sports'),
+                              lambda sport: any(event.startswith(f'{sport} ') for event in top_events)),
+            'Team': baseline('Team', bundle.get('top_teams')),
+        }
+        sports = [*featured['Sport'], *([baselines['Sport']] if baselines['Sport'] else [])]
+        baselines['Event'] = baseline('Event', top_events,
+                                      lambda event: any(event.startswith(f'{sport} ') for sport in sports))
+        return cls(bundle['features'], baselines={col: value for col, value in baselines.items() if value})
+
+    def extend(self, df: pd.DataFrame) -> 'FeatureEncoder':
+        """
+        Return an encoder that also knows the categories first seen in ``df``.
+
+        New features are appended after the existing ones (sorted within each
+        column), so every existing feature keeps its position and models
+        fitted on the old layout read the same columns.
+        """
+        features = list(self.features)
+        for col in self.categorical:
+            known = set(self._index[col])
+            if col in self.baselines:
+                known.add(self.baselines[col])
+            features += [f'{col}_{value}' for value in sorted(df[col].dropna().unique()) if value not in known]
+        return type(self)(features, self.numeric, self.categorical, self.baselines)
+
+    @property
+    def vocabularies(self) -> dict:
+        """Encoded categories per column, in feature order."""
+        return {col: list(index) for col, index in self._index.items()}
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Encode a batch of rows into a dense float32 matrix."""
+        n_rows = len(df)
+        X = np.zeros((n_rows, len(self.features)), dtype=np.float32)
+        X[:, self._numeric_positions] = df[self.numeric].to_numpy(dtype=np.float32, na_value=np.nan)
+
+        rows = np.arange(n_rows)
+        for col in self.categorical:
+            codes = pd.Categorical(df[col], categories=self._categories[col]).codes
+            hit = codes >= 0
+            X[rows[hit], self._positions[col][codes[hit]]] = 1
+        return X
+
+    def transform_one(self, record: dict) -> np.ndarray:
+        """Encode a single row given as a mapping; returns a (1, n_features) matrix."""
+        return self.transform_records([record])
+
+    def transform_records(self, records) -> np.ndarray:
+        """Encode a short list of mappings without building a DataFrame."""
+        X = np.zeros((len(records), len(self.features)), dtype=np.float32)
+        for row, record in enumerate(records):
+            for col, i in zip(self.numeric, self._numeric_positions):
+                X[row, i] = record[col]
+            for col in self.categorical:
+                i = self._index[col].get(record[col])
+                if i is not None:
+                    X[row, i] = 1
+        return X
+
+    def transform_grid(self, record: dict, axes: dict) -> np.ndarray:
+        """
+        Encode every combination of the ``axes`` values ({column: values}),
+        taking the other columns from ``record``.
+
+        Rows follow ``itertools.product`` order of the axes (the last axis
+        varies fastest). The base row is encoded once and only the swept
+        columns are rewritten, so a large grid costs little more than its
+        memory.
+        """
+        base = self.transform_records([record])[0]
+        shape = [len(values) for values in axes.values()]
+        X = np.repeat(base[np.newaxis, :], int(np.prod(shape)), axis=0)
+
+        for (col, values), grid in zip(axes.items(), np.indices(shape).reshape(len(shape), -1)):
+            if col in self.numeric:
+                X[:, self._numeric_positions[self.numeric.index(col)]] = np.asarray(values, dtype=np.float32)[grid]
+            else:
+                X[:, self._positions[col]] = 0
+                positions = np.array([self._index[col].get(value, -1) for value in values], dtype=np.intp)[grid]
+                hit = positions >= 0
+                X[np.flatnonzero(hit), positions[hit]] = 1
+        return X
+
+    def to_frame(self, X: np.ndarray, index=None) -> pd.DataFrame:
+        """Wrap an encoded matrix with the feature names the model was fitted on."""
+        return pd.DataFrame(X, columns=self.features, index=index, copy=False)
@@ -0,0 +1,166 @@
+"""Cache of rendered matplotlib figures as PNG bytes.
+
+The heatmaps on the Overall and Country-wise pages depend only on the dataset
+and the selected country, so each one is drawn once. After that it is served
+from a size-bounded in-memory LRU, backed by PNG files under
+data/.cache/figures. The files are keyed by dataset version, view and country,
+so they survive restarts. Figures are drawn on an Agg ``Figure`` rather than
+through pyplot, which makes rendering safe from a background thread.
+
+Pre-render every country ahead of time:
+
+    python src/figcache.py
+"""
+
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+from dataset import CACHE_DIR
+
+FIGURE_CACHE_DIR = CACHE_DIR / 'figures'
+# Bump when the figures are drawn differently, so stored PNGs are not reused
+RENDER_VERSION = 1
+
+
+def figure_key(version: str, view: str, name: str = '') -> str:
+    """File-system safe key for one figure."""
+    digest = hashlib.blake2b(name.encode(), digest_size=6).hexdigest() if name else 'all'
+    return f'r{RENDER_VERSION}-{version}-{view}-{digest}'
+
+
+def heatmap_png(pt, figsize=(12, 12)) -> bytes:
+    """Draw ``sns.heatmap(pt)`` and return it as PNG bytes."""
+    from matplotlib.figure import Figure
+    import seaborn as sns
+
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    sns.heatmap(pt, ax=ax)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+class FigureCache:
+    """Two-tier cache of figure bytes: an LRU bounded to ``max_bytes`` in memory, then disk."""
+
+    def __init__(self, directory=FIGURE_CACHE_DIR, max_bytes=64 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = {'memory': 0, 'disk': 0, 'rendered': 0}
+        self._memory = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str):
+        return self.directory / f'{key}.png'
+
+    def _remember(self, key: str, png: bytes):
+        with self._lock:
+            self._size += len(png) - len(self._memory.pop(key, b''))
+            self._memory[key] = png
+            while self._size > self.max_bytes and len(self._memory) > 1:
+                self._size -= len(self._memory.popitem(last=False)[1])
+
+    def get(self, key: str):
+        """Cached bytes for ``key``, or None."""
+        with self._lock:
+            png = self._memory.get(key)
+            if png is not None:
+                self._memory.move_to_end(key)
+                self.hits['memory'] += 1
+                return png
+        try:
+            png = self._path(key).read_bytes()
+        except OSError:
+            return None
+        with self._lock:
+            self.hits['disk'] += 1
+        self._remember(key, png)
+        return png
+
+    def put(self, key: str, png: bytes, memory=True):
+        if memory:
+            self._remember(key, png)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_file = self._path(key).with_suffix(f'.{threading.get_ident()}.tmp')
+            tmp_file.write_bytes(png)
+            os.replace(tmp_file, self._path(key))
+        except OSError:
+            pass
+
+    def get_or_render(self, key: str, render) -> bytes:
+        """Return cached bytes, or call ``render()`` (returning PNG bytes) and store the result."""
+        png = self.get(key)
+        metrics.count_cache('figcache.FigureCache', png is not None)
+        if png is None:
+            png = render()
+            with self._lock:
+                self.hits['rendered'] += 1
+            self.put(key, png)
+        return png
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self._path(key).exists()
+
+    def prune(self, version: str):
+        """Delete stored figures of other dataset versions or render versions."""
+        prefix = f'r{RENDER_VERSION}-{version}-'
+        for path in self.directory.glob('*.png'):
+            if not path.name.startswith(prefix):
+                path.unlink(missing_ok=True)
+
+
+def prerender_countries(cache: FigureCache, version: str, countries, heatmap_for) -> int:
+    """Render the sports heatmap of every country not yet on disk; returns how many were drawn."""
+    cache.prune(version)
+    rendered = 0
+    for country in countries:
+        key = figure_key(version, 'country', country)
+        if cache.contains(key):
+            continue
+        pt = heatmap_for(country)
+        if pt.empty:
+            # Nothing to draw for countries without medals
+            continue
+        # Straight to disk: pre-rendering should not evict what sessions are looking at
+        cache.put(key, heatmap_png(pt), memory=False)
+        rendered += 1
+    return rendered
+
+
+def start_prerender(cache: FigureCache, version: str, countries, heatmap_for) -> threading.Thread:
+    """Run ``prerender_countries`` in a daemon thread."""
+    thread = threading.Thread(target=prerender_countries, args=(cache, version, list(countries), heatmap_for),
+                              name='figure-prerender', daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == '__main__':
+    import aggregates
+    import helper
+    from shared_frame import load_shared_frame
+
+    df = load_shared_frame()
+    version = aggregates.aggregates_version()
+    index = helper.region_index(df)
+    countries = helper.country_year_list(df)[1][1:]
+    cache = FigureCache()
+
+    start = time.perf_counter()
+    overall = aggregates.load_overall(df, version)
+    cache.get_or_render(figure_key(version, 'events'), lambda: heatmap_png(overall['events_pivot']))
+    rendered = prerender_countries(cache, version, countries,
+                                   lambda country: helper.country_bundle(df, country, index)['heatmap'])
+    print(f"Rendered {rendered} country heatmaps ({len(countries)} countries) in "
+          f"{time.perf_counter() - start:.1f}s to {cache.directory}")
@@ -0,0 +1,209 @@
+"""Array-based inference engine for the trained RandomForestClassifier.
+
+``CompiledForest.from_sklearn`` flattens every tree of the forest into one set
+of contiguous node arrays (feature, threshold, children, leaf probabilities).
+Prediction walks all trees for all rows level by level with vectorized NumPy
+gathers, so labels and probabilities come out of a single traversal and the
+per-call overhead is a few dozen array operations instead of sklearn's
+per-tree dispatch.
+
+The results are identical to ``RandomForestClassifier.predict_proba`` with
+trees accumulated in order (``n_jobs=1``): inputs are compared as float32
+against float64 thresholds exactly like sklearn does, and per-tree leaf
+probabilities are summed tree by tree before dividing by the tree count.
+"""
+
+import argparse
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+import metrics
+
+ARRAYS = ['feature', 'threshold', 'left', 'right', 'missing_left', 'value', 'roots', 'classes']
+# Derived in __init__; stored with save_arrays so memory-mapped loads copy nothing
+DERIVED_ARRAYS = ['children', 'threshold32']
+
+
+class CompiledForest:
+    """A forest of binary trees stored as flat node arrays."""
+
+    # Rows traversed at once; small blocks keep the gathered X rows in cache
+    block_size = 4096
+
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, classes, depth,
+                 children=None, threshold32=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.depth = int(depth)
+
+        # Interleaved (left, right) children: the next node is children[2 * node + go_right]
+        if children is None:
+            children = np.column_stack([left, right]).ravel()
+        self._children = children
+        # float32 inputs compare against float64 thresholds in sklearn. Rounding each
+        # threshold down to the nearest float32 keeps ``x <= t`` exact in float32.
+        if threshold32 is None:
+            threshold32 = threshold.astype(np.float32)
+            too_high = threshold32.astype(np.float64) > threshold
+            threshold32[too_high] = np.nextafter(threshold32[too_high], np.float32(-np.inf))
+        self._threshold32 = threshold32
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted sklearn forest (or single tree) classifier."""
+        estimators = getattr(model, 'estimators_', [model])
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        depth = 0
+
+        for estimator in estimators:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            nodes = np.arange(offset, offset + n_nodes)
+            is_leaf = tree.children_left < 0
+
+            # Leaves point at themselves, so extra traversal steps are no-ops
+            left = np.where(is_leaf, nodes, tree.children_left + offset)
+            right = np.where(is_leaf, nodes, tree.children_right + offset)
+
+            value = tree.value[:, 0, :len(model.classes_)].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(left)
+            rights.append(right)
+            missing.append(np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(n_nodes)), dtype=bool))
+            values.append(value / normalizer)
+            roots.append(offset)
+
+            offset += n_nodes
+            depth = max(depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            missing_left=np.concatenate(missing),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.array(roots, dtype=np.intp),
+            classes=np.asarray(model.classes_),
+            depth=depth,
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def apply(self, X) -> np.ndarray:
+        """Return the leaf reached in every tree, shape ``(n_trees, n_samples)``."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        flat = X.ravel()
+        has_nan = np.isnan(flat).any()
+
+        # Row offset into the flattened X for every (tree, sample) cell
+        base = np.tile(np.arange(n_samples, dtype=np.intp) * n_features, self.n_trees)
+        node = np.repeat(self.roots, n_samples)
+
+        # Preallocated buffers; take(mode='clip') skips bounds checks and allows out=
+        index = np.empty_like(node)
+        values = np.empty(len(node), dtype=np.float32)
+        threshold = np.empty(len(node), dtype=np.float32)
+        go_right = np.empty(len(node), dtype=bool)
+
+        for _ in range(self.depth):
+            np.take(self.feature, node, out=index, mode='clip')
+            index += base
+            np.take(flat, index, out=values, mode='clip')
+            np.take(self._threshold32, node, out=threshold, mode='clip')
+            np.greater(values, threshold, out=go_right)
+            if has_nan:
+                nan = np.isnan(values)
+                go_right[nan] = ~self.missing_left[node[nan]]
+            node <<= 1
+            node += go_right
+            np.take(self._children, node, out=node, mode='clip')
+        return node.reshape(self.n_trees, n_samples)
+
+    @metrics.timed()
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities, averaged over trees like sklearn."""
+        X = np.asarray(X, dtype=np.float32)
+        proba = np.zeros((len(X), len(self.classes_)), dtype=np.float64)
+
+        for start in range(0, len(X), self.block_size):
+            leaves = self.apply(X[start:start + self.block_size])
+            block = proba[start:start + self.block_size]
+            for tree_leaves in leaves:
+                block += self.value[tree_leaves]
+
+        proba /= self.n_trees
+        return proba
+
+    def predict_with_proba(self, X):
+        """Labels and probabilities from a single traversal."""
+        proba = self.predict_proba(X)
+        return self.classes_.take(proba.argmax(axis=1)), proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.predict_with_proba(X)[0]
+
+    def save(self, path):
+        """Write the node arrays to an .npz file."""
+        np.savez(path, depth=self.depth, **{name: self._array(name) for name in ARRAYS})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(depth=int(arrays['depth']), **{name: arrays[name] for name in ARRAYS})
+
+    def _array(self, name):
+        return getattr(self, {'classes': 'classes_', 'children': '_children',
+                              'threshold32': '_threshold32'}.get(name, name))
+
+    def save_arrays(self, directory):
+        """Write every node array, derived ones included, as a separate .npy file."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS + DERIVED_ARRAYS:
+            np.save(directory / f'{name}.npy', np.ascontiguousarray(self._array(name)), allow_pickle=False)
+
+    @classmethod
+    def load_arrays(cls, directory, depth, mmap_mode='r'):
+        """
+        Load arrays written by ``save_arrays``.
+
+        With the default ``mmap_mode='r'`` nothing is read up front: pages are
+        faulted in on use and shared by every process mapping the same files.
+        """
+        directory = Path(directory)
+        arrays = {name: np.load(directory / f'{name}.npy', mmap_mode=mmap_mode, allow_pickle=False)
+                  for name in ARRAYS + DERIVED_ARRAYS}
+        return cls(depth=depth, **arrays)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the trained forest to flat NumPy arrays')
+    parser.add_argument('--model', default=str(Path('models') / 'model.pkl'))
+    parser.add_argument('--output', default=str(Path('models') / 'forest.npz'))
+    args = parser.parse_args()
+
+    with open(args.model, 'rb') as f:
+        forest = CompiledForest.from_sklearn(pickle.load(f)['model'])
+    forest.save(args.output)
+    print(f'Exported {forest.n_trees} trees ({forest.n_nodes} nodes, depth {forest.depth}) to {args.output}')
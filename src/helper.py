@@ -1,25 +1,44 @@
 import numpy as np
+import pandas as pd
 
-def fetch_medal_tally(df, year, country):
-    medal_df = df.drop_duplicates(subset=['Team','NOC','Games','Year','City','Sport','Event','Medal'])
+import metrics
+
+MEDAL_TALLY_KEYS = ['Team','NOC','Games','Year','City','Sport','Event','Medal']
+
+@metrics.timed()
+def medal_cube(df):
+    # Deduplicated Gold/Silver/Bronze counts per (Year, region); every tally
+    # view is a lookup or a small reduction over this frame.
+    medal_df = df.drop_duplicates(subset=MEDAL_TALLY_KEYS)
+    cube = medal_df.groupby(['Year', 'region'], observed=True)[['Gold','Silver','Bronze']].sum()
+    return cube.astype('int64')
+
+def _cube_slice(cube, key, level):
+    try:
+        return cube.xs(key, level=level)
+    except KeyError:
+        return cube.iloc[:0].droplevel(level)
+
+@metrics.timed()
+def fetch_medal_tally(df, year, country, cube=None):
+    if cube is None:
+        cube = medal_cube(df)
 
     if year == 'Overall' and country == 'Overall':
-        temp_df = medal_df
+        x = cube.groupby(level='region', observed=True).sum()
     elif year == 'Overall':
-        temp_df = medal_df[medal_df['region'] == country]
+        x = _cube_slice(cube, country, 'region')
     elif country == 'Overall':
-        temp_df = medal_df[medal_df['Year'] == int(year)]
+        x = _cube_slice(cube, int(year), 'Year')
     else:
-        temp_df = medal_df[(medal_df['Year'] == int(year)) & (medal_df['region'] == country)]
-
-    if country != 'Overall' and year == 'Overall':
-        x = temp_df.groupby('Year')[['Gold','Silver','Bronze']].sum().reset_index()
-    else:
-        x = temp_df.groupby('region')[['Gold','Silver','Bronze']].sum().reset_index()
+        x = _cube_slice(cube, int(year), 'Year')
+        x = x[x.index == country]
 
+    x = x.reset_index()
     x['total'] = x[['Gold','Silver','Bronze']].sum(axis=1)
     return x
 
+@metrics.timed()
 def country_year_list(df):
     years = sorted(df['Year'].unique().tolist())
     years.insert(0, 'Overall')
@@ -29,6 +48,7 @@ def country_year_list(df):
 
     return years, countries
 
+@metrics.timed()
 def data_over_time(df, col):
     temp = df.drop_duplicates(['Year', col])
     result = temp.groupby('Year')[col].count().reset_index()
@@ -37,37 +57,77 @@ def data_over_time(df, col):
 
     return result.sort_values('Edition')
 
+def _name_counts(temp):
+    # Categorical value_counts lists every category (with zeros) and breaks
+    # ties in category order; count the names themselves instead
+    names = temp['Name']
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        # np.asarray takes only the used categories; astype converts them all
+        names = pd.Series(np.asarray(names, dtype=object), index=names.index, name=names.name)
+    return names.value_counts()
+
+@metrics.timed()
 def most_successful(df, sport):
     temp = df.dropna(subset=['Medal'])
     if sport != 'Overall':
         temp = temp[temp['Sport'] == sport]
 
-    return temp['Name'].value_counts().reset_index().head(15)
+    return _name_counts(temp).reset_index().head(15)
+
+@metrics.timed()
+def region_index(df):
+    # Medal rows split by region once; a country's slice is then a dict lookup
+    medals = df.dropna(subset=['Medal'])
+    return dict(tuple(medals.groupby('region', observed=True, sort=False)))
 
-def yearwise_medal_tally(df, country):
-    temp = df.dropna(subset=['Medal']).copy()
-    temp = temp[temp['region'] == country]
+def _country_medals(df, country, index=None):
+    if index is not None:
+        return index.get(country, df.iloc[:0])
+    temp = df.dropna(subset=['Medal'])
+    return temp[temp['region'] == country]
+
+def _yearwise(temp):
     return temp.groupby('Year')['Medal'].count().reset_index()
 
-def country_event_heatmap(df, country):
-    temp = df.dropna(subset=['Medal']).copy()
-    temp = temp[temp['region'] == country]
-    return temp.pivot_table(index='Sport', columns='Year', values='Medal', aggfunc='count').fillna(0)
+def _event_heatmap(temp):
+    return temp.pivot_table(index='Sport', columns='Year', values='Medal', aggfunc='count', observed=True).fillna(0)
 
-def most_successful_countrywise(df, country):
-    temp = df.dropna(subset=['Medal'])
-    temp = temp[temp['region'] == country]
-    return temp['Name'].value_counts().reset_index().head(10)
+def _top_athletes(temp):
+    return _name_counts(temp).reset_index().head(10)
+
+@metrics.timed()
+def yearwise_medal_tally(df, country, index=None):
+    return _yearwise(_country_medals(df, country, index))
+
+@metrics.timed()
+def country_event_heatmap(df, country, index=None):
+    return _event_heatmap(_country_medals(df, country, index))
+
+@metrics.timed()
+def most_successful_countrywise(df, country, index=None):
+    return _top_athletes(_country_medals(df, country, index))
+
+@metrics.timed()
+def country_bundle(df, country, index=None):
+    # Everything the Country-wise Analysis page shows, from one slice
+    temp = _country_medals(df, country, index)
+    return {
+        'yearwise': _yearwise(temp),
+        'heatmap': _event_heatmap(temp),
+        'top_athletes': _top_athletes(temp),
+    }
 
+@metrics.timed()
 def weight_v_height(df, sport):
     temp = df.drop_duplicates(subset=['Name','region']).copy()
-    temp['Medal'] = temp['Medal'].fillna('No Medal')
+    temp['Medal'] = temp['Medal'].astype(object).fillna('No Medal')
 
     if sport != 'Overall':
         temp = temp[temp['Sport'] == sport]
 
     return temp
 
+@metrics.timed()
 def men_vs_women(df):
     temp = df.drop_duplicates(subset=['Name','region'])
 
@@ -0,0 +1,185 @@
+"""Background batch scoring jobs for the prediction page.
+
+An uploaded CSV is split into chunks that a process pool scores in
+parallel. Each worker opens the model once; a directory artifact is
+memory-mapped, so the workers share one copy of the forest. Jobs live in the
+``JobManager``, not in the Streamlit script, so a rerun only polls them. A
+job can be cancelled between chunks. Jobs are keyed by a hash of the upload
+and the model, so scoring the same file again returns the finished job
+without rescoring.
+
+    manager = JobManager('models/model')
+    job = manager.submit(upload_key(data, model_version('models/model')), df)
+    job.progress, job.state
+    labels, probabilities = job.result()
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataset import file_hash
+from predict import load_artifact, score_batch
+
+CHUNK_ROWS = 20_000
+# Finished jobs kept for repeated uploads and downloads
+MAX_FINISHED = 16
+
+RUNNING, DONE, CANCELLED, FAILED = 'running', 'done', 'cancelled', 'failed'
+
+_worker_data = {}
+
+
+def _init_worker(model_path):
+    data = load_artifact(model_path)
+    _worker_data['engine'], _worker_data['encoder'] = data['engine'], data['encoder']
+
+
+def _score_chunk(df):
+    return score_batch(_worker_data['engine'], _worker_data['encoder'], df)
+
+
+def model_version(model_path) -> str:
+    """Hash identifying the saved model; a directory artifact is identified by its header."""
+    model_path = Path(model_path)
+    return file_hash(model_path / 'meta.json' if model_path.is_dir() else model_path)
+
+
+def upload_key(data: bytes, model_version: str) -> str:
+    return f'{hashlib.blake2b(data, digest_size=16).hexdigest()}-{model_version}'
+
+
+class Job:
+    """
+    One upload (``input``) being scored chunk by chunk.
+
+    ``state``, ``progress`` and ``rows_done`` are safe to read from any thread.
+    """
+
+    def __init__(self, key: str, df: pd.DataFrame, n_chunks: int):
+        self.key = key
+        self.input = df
+        self.rows = len(df)
+        self.n_chunks = n_chunks
+        self.state = RUNNING
+        self.error = None
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.rows_done = 0
+        self._results = [None] * n_chunks
+        self._futures = []
+        self._lock = threading.Lock()
+
+    @property
+    def progress(self) -> float:
+        return self.rows_done / self.rows if self.rows else 1.0
+
+    @property
+    def running(self) -> bool:
+        return self.state == RUNNING
+
+    def _finish(self, state, error=None):
+        # Called with _lock held
+        self.state = state
+        self.error = error
+        self.elapsed = time.perf_counter() - self.started
+
+    def _chunk_done(self, i: int, rows: int, future):
+        try:
+            result = future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            with self._lock:
+                if self.running:
+                    self._finish(FAILED, str(e))
+            self.cancel()
+            return
+        with self._lock:
+            if not self.running:
+                return
+            self._results[i] = result
+            self.rows_done += rows
+            if all(part is not None for part in self._results):
+                self._finish(DONE)
+
+    def cancel(self):
+        """Stop scoring: queued chunks are dropped, chunks already running are discarded."""
+        with self._lock:
+            if self.running:
+                self._finish(CANCELLED)
+        for future in self._futures:
+            future.cancel()
+
+    def result(self):
+        """``(labels, probabilities)`` for every row, in upload order; only once the job is done."""
+        if self.state != DONE:
+            raise RuntimeError(f"job is {self.state}")
+        labels, probabilities = zip(*self._results)
+        return np.concatenate(labels), np.concatenate(probabilities)
+
+
+class JobManager:
+    """Process pool plus the table of jobs, shared by every session of the server."""
+
+    def __init__(self, model_path, workers=None, chunk_rows=CHUNK_ROWS, max_finished=MAX_FINISHED):
+        self.chunk_rows = chunk_rows
+        self.max_finished = max_finished
+        # spawn, not fork: the Streamlit server is multi-threaded
+        self._pool = ProcessPoolExecutor(workers or os.cpu_count(), mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_init_worker, initargs=(str(model_path),))
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def submit(self, key: str, df: pd.DataFrame) -> Job:
+        """Start scoring ``df``, or return the job already running or finished for ``key``."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.state in (RUNNING, DONE):
+                self._jobs.move_to_end(key)
+                return job
+
+            starts = range(0, len(df), self.chunk_rows)
+            job = Job(key, df, len(starts))
+            self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            self._evict()
+
+        if not len(df):
+            with job._lock:
+                job._results = [(np.empty(0, dtype=np.int64), np.empty(0))]
+                job._finish(DONE)
+        for i, start in enumerate(starts):
+            if not job.running:
+                break
+            chunk = df.iloc[start:start + self.chunk_rows]
+            future = self._pool.submit(_score_chunk, chunk)
+            job._futures.append(future)
+            future.add_done_callback(lambda future, i=i, rows=len(chunk): job._chunk_done(i, rows, future))
+        return job
+
+    def _evict(self):
+        # Called with _lock held; running jobs are never evicted
+        finished = [key for key, job in self._jobs.items() if not job.running]
+        for key in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[key]
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            job.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,339 @@
+"""In-process instrumentation of the hot paths.
+
+Functions decorated with ``timed`` record call counts, errors, a latency
+histogram and rows processed. Streamlit cache wrappers built with ``cached``
+also record hit rates. Everything lives in one process-wide registry. The
+diagnostics page shows it, and it can be exported as JSON or Prometheus text:
+
+    import metrics
+
+    @metrics.timed()
+    def most_successful(df, sport): ...
+
+    with metrics.track('page.score') as call:
+        call.rows = len(df)
+
+Set ``OLYMPICS_METRICS=0`` to switch recording off; a decorated call then
+costs one flag check. Per-call peak memory is recorded only while tracemalloc
+is tracing (``OLYMPICS_METRICS_MEMORY=1`` starts it at import, at a cost of
+several times slower allocations). With ``OLYMPICS_METRICS_PORT`` set,
+``serve_from_env`` exposes ``/metrics`` (Prometheus) and ``/metrics.json`` on
+localhost.
+"""
+
+import bisect
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, math.inf)
+
+_enabled = os.environ.get('OLYMPICS_METRICS', '1') != '0'
+if os.environ.get('OLYMPICS_METRICS_MEMORY') == '1' and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+_lock = threading.Lock()
+_stats = {}
+_local = threading.local()
+_server = None
+
+
+class _Stat:
+    __slots__ = ('calls', 'errors', 'seconds', 'max_seconds', 'buckets', 'rows', 'peak_bytes', 'hits', 'misses')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.rows = 0
+        self.peak_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+
+def _stat(name: str) -> _Stat:
+    # Called with _lock held
+    stat = _stats.get(name)
+    if stat is None:
+        stat = _stats[name] = _Stat()
+    return stat
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on=True):
+    """Switch recording on or off for the whole process."""
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def observe(name: str, seconds: float, rows=None, peak_bytes=None, error=False):
+    """Record one finished call."""
+    bucket = bisect.bisect_left(BUCKETS_MS, seconds * 1e3)
+    with _lock:
+        stat = _stat(name)
+        stat.calls += 1
+        stat.errors += error
+        stat.seconds += seconds
+        stat.max_seconds = max(stat.max_seconds, seconds)
+        stat.buckets[bucket] += 1
+        if rows:
+            stat.rows += rows
+        if peak_bytes is not None and peak_bytes > stat.peak_bytes:
+            stat.peak_bytes = peak_bytes
+
+
+def count_cache(name: str, hit: bool):
+    with _lock:
+        stat = _stat(name)
+        if hit:
+            stat.hits += 1
+        else:
+            stat.misses += 1
+
+
+class track:
+    """Context manager timing one block; set ``.rows`` inside it to count rows."""
+
+    __slots__ = ('name', 'rows', '_start', '_memory')
+
+    def __init__(self, name: str, rows=None):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        # Peak memory is measured for the outermost tracked block only, since
+        # resetting tracemalloc's peak inside a nested one would hide the outer peak
+        depth = getattr(_local, 'depth', 0)
+        _local.depth = depth + 1
+        self._memory = None
+        if depth == 0 and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._memory = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        _local.depth -= 1
+        peak = None
+        if self._memory is not None:
+            peak = tracemalloc.get_traced_memory()[1] - self._memory
+        observe(self.name, seconds, self.rows, peak, exc_type is not None)
+        return False
+
+
+def _input_rows(args) -> int:
+    # Rows of the first array-like argument (a DataFrame, Series or matrix)
+    for arg in args:
+        shape = getattr(arg, 'shape', None)
+        if shape:
+            return shape[0]
+    return 0
+
+
+def timed(name=None, rows=None):
+    """
+    Decorator recording every call of the function under ``name``
+    (default ``<module>.<qualname>``).
+
+    Rows default to the length of the first array-like argument; pass
+    ``rows='result'`` to count the returned rows, or a callable taking
+    ``(args, result)``.
+    """
+    def decorate(fn):
+        label = name or f'{fn.__module__}.{fn.__qualname__}'
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with track(label) as call:
+                result = fn(*args, **kwargs)
+                if rows is None:
+                    call.rows = _input_rows(args)
+                elif rows == 'result':
+                    call.rows = _input_rows([result])
+                else:
+                    call.rows = rows(args, result)
+            return result
+        return wrapper
+    return decorate
+
+
+def cached(name: str, cache_decorator):
+    """
+    Apply a caching decorator (``st.cache_data``, ``st.cache_resource``) and
+    count its hits and misses under ``name``.
+
+    A call is a miss when the wrapped function actually ran. Its compute time
+    is recorded under ``name`` as well.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            _local.missed = getattr(_local, 'missed', set()) | {name}
+            with track(name):
+                return fn(*args, **kwargs)
+
+        cached_fn = cache_decorator(compute)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return cached_fn(*args, **kwargs)
+            missed = getattr(_local, 'missed', set())
+            missed.discard(name)
+            _local.missed = missed
+            result = cached_fn(*args, **kwargs)
+            count_cache(name, name not in _local.missed)
+            _local.missed.discard(name)
+            return result
+
+        wrapper.clear = cached_fn.clear
+        return wrapper
+    return decorate
+
+
+def _quantile(buckets, q: float, max_ms: float) -> float:
+    """Upper bucket bound (ms) below which a fraction ``q`` of the calls fall."""
+    target = q * sum(buckets)
+    seen = 0
+    for bound, count in zip(BUCKETS_MS, buckets):
+        seen += count
+        if count and seen >= target:
+            return min(bound, max_ms)
+    return 0.0
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def snapshot() -> dict:
+    """All recorded metrics as plain data."""
+    with _lock:
+        stats = {name: (stat.calls, stat.errors, stat.seconds, stat.max_seconds, list(stat.buckets), stat.rows,
+                        stat.peak_bytes, stat.hits, stat.misses)
+                 for name, stat in _stats.items()}
+    functions = {}
+    for name, (calls, errors, seconds, max_seconds, buckets, rows, peak, hits, misses) in sorted(stats.items()):
+        lookups = hits + misses
+        max_ms = max_seconds * 1e3
+        functions[name] = {
+            'calls': calls,
+            'errors': errors,
+            'total_ms': seconds * 1e3,
+            'mean_ms': seconds * 1e3 / calls if calls else 0.0,
+            'p50_ms': _quantile(buckets, 0.5, max_ms),
+            'p90_ms': _quantile(buckets, 0.9, max_ms),
+            'p99_ms': _quantile(buckets, 0.99, max_ms),
+            'max_ms': max_ms,
+            'rows': rows,
+            'peak_bytes': peak,
+            'cache_hits': hits,
+            'cache_misses': misses,
+            'cache_hit_rate': hits / lookups if lookups else None,
+            'buckets': dict(zip(['+Inf' if bound == math.inf else f'{bound:g}' for bound in BUCKETS_MS], buckets)),
+        }
+    return {
+        'enabled': _enabled,
+        'tracing_memory': tracemalloc.is_tracing(),
+        'peak_rss_bytes': peak_rss_bytes(),
+        'functions': functions,
+    }
+
+
+def to_json(indent=2) -> str:
+    return json.dumps(snapshot(), indent=indent)
+
+
+def to_prometheus(prefix='olympics') -> str:
+    """Prometheus text exposition format."""
+    data = snapshot()
+    lines = []
+    if data['peak_rss_bytes'] is not None:
+        lines += [f'# TYPE {prefix}_peak_rss_bytes gauge', f'{prefix}_peak_rss_bytes {data["peak_rss_bytes"]}']
+    lines.append(f'# TYPE {prefix}_call_seconds histogram')
+    for name, stat in data['functions'].items():
+        if not stat['calls']:
+            continue
+        cumulative = 0
+        for bound, count in zip(BUCKETS_MS, stat['buckets'].values()):
+            cumulative += count
+            le = '+Inf' if bound == math.inf else f'{bound / 1e3:g}'
+            lines.append(f'{prefix}_call_seconds_bucket{{function="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'{prefix}_call_seconds_sum{{function="{name}"}} {stat["total_ms"] / 1e3:.6f}')
+        lines.append(f'{prefix}_call_seconds_count{{function="{name}"}} {stat["calls"]}')
+    for metric, key, kind in [('errors_total', 'errors', 'counter'), ('rows_total', 'rows', 'counter'),
+                              ('peak_bytes', 'peak_bytes', 'gauge'), ('cache_hits_total', 'cache_hits', 'counter'),
+                              ('cache_misses_total', 'cache_misses', 'counter')]:
+        lines.append(f'# TYPE {prefix}_{metric} {kind}')
+        lines += [f'{prefix}_{metric}{{function="{name}"}} {stat[key]}'
+                  for name, stat in data['functions'].items()]
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            body, content_type = to_prometheus().encode(), 'text/plain; version=0.0.4'
+        elif self.path == '/metrics.json':
+            body, content_type = to_json().encode(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_http_server(port: int, host='127.0.0.1'):
+    """Serve /metrics and /metrics.json from a daemon thread; once per process."""
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name='metrics-http', daemon=True).start()
+    return _server
+
+
+def serve_from_env():
+    """Start the endpoint on ``OLYMPICS_METRICS_PORT`` if set; returns the server or None."""
+    port = os.environ.get('OLYMPICS_METRICS_PORT')
+    if not port:
+        return None
+    try:
+        return start_http_server(int(port))
+    except OSError:
+        # Another server process on this host already holds the port
+        return None
@@ -0,0 +1,451 @@
+"""Staged, cached training pipeline for the medal prediction model.
+
+    load -> profile -> clean -> encode -> split -> fit -> evaluate -> export
+
+``profile`` is the streaming column profile from profiler.py; ``clean`` takes
+the top sports, events and teams from it instead of counting them again, and
+``export`` saves it as JSON next to the model.
+
+Every stage output except ``load`` (already cached as Parquet by dataset.py)
+and ``export`` (which writes the model files) is pickled under
+data/.cache/pipeline. A stage's cache key hashes its own parameters and the
+keys of the stages it reads from, with the dataset's content hash at the
+root. Changing ``max_depth`` therefore reruns only fit and evaluate, and a run
+that was interrupted resumes after the last finished stage. Only the
+``KEEP_VERSIONS`` most recently used outputs of each stage are kept.
+
+``sweep`` cross-validates a parameter grid on the training split with one
+process per core; each (parameters, fold) result is cached as well.
+
+    python src/pipeline.py --max-depth 12
+    python src/pipeline.py --sweep --n-estimators 50 100 --max-depth 8 10 12
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+from artifact import save_artifact
+from dataset import CACHE_DIR, dataset_version, downcast_integers, load_athlete_events
+from encoder import FeatureEncoder
+from profiler import load_profile, profile_frame, profile_path, ranked_counts, save_profile, top_values
+
+FEATURE_COLUMNS = ['Age', 'Height', 'Weight', 'Sex', 'Sport', 'Event', 'Team', 'Year']
+CATEGORICAL_FEATURES = ['Sex', 'Sport', 'Event', 'Team']
+PIPELINE_CACHE_DIR = CACHE_DIR / 'pipeline'
+SWEEP_PARAMS = ['n_estimators', 'max_depth']
+# Cached outputs kept per stage, most recently used first; older keys are deleted
+KEEP_VERSIONS = 3
+
+DEFAULT_PARAMS = {
+    'n_sports': 15,
+    'n_events': 40,
+    'n_teams': 50,
+    'test_size': 0.2,
+    'random_state': 42,
+    'n_estimators': 50,
+    'max_depth': 10,
+}
+
+
+# ---------------- STAGES ----------------
+def clean_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep the feature columns with a binary Medal target, dropping incomplete rows."""
+    df = df[FEATURE_COLUMNS + ['Medal']].copy()
+
+    # Convert medal to binary (1 if medal was won, 0 if no medal)
+    df['Medal'] = (~df['Medal'].isna()).astype(int)
+
+    # Drop rows with missing required features
+    return downcast_integers(df.dropna(subset=FEATURE_COLUMNS))
+
+
+def top_categories(df: pd.DataFrame, n_sports=15, n_events=40, n_teams=50):
+    """Most frequent sports, events and teams, ranked like the profile ranks them."""
+    return (ranked_counts(df['Sport'].value_counts()).head(n_sports).index,
+            ranked_counts(df['Event'].value_counts()).head(n_events).index,
+            ranked_counts(df['Team'].value_counts()).head(n_teams).index)
+
+
+def select_top(df: pd.DataFrame, top_sports, top_events, top_teams) -> pd.DataFrame:
+    df = df[df['Sport'].isin(top_sports)]
+    df = df[df['Event'].isin(top_events)]
+    return df[df['Team'].isin(top_teams)]
+
+
+def clean_stage(df, profile, n_sports, n_events, n_teams) -> dict:
+    # The profile's complete-row counts are the cleaned rows' counts
+    tops = [top_values(profile, col, n) for col, n in [('Sport', n_sports), ('Event', n_events), ('Team', n_teams)]]
+    df = clean_rows(df)
+    if any(top is None for top in tops):
+        # Sketched counts are approximate: count the cleaned rows instead
+        tops = [index.tolist() for index in top_categories(df, n_sports, n_events, n_teams)]
+    top_sports, top_events, top_teams = tops
+    return {
+        'df': select_top(df, top_sports, top_events, top_teams),
+        'top_sports': top_sports,
+        'top_events': top_events,
+        'top_teams': top_teams,
+    }
+
+
+def encode_stage(clean: dict) -> dict:
+    # One-hot encoding for categorical variables (first category of each is the baseline)
+    df = clean['df']
+    encoder = FeatureEncoder.fit(df)
+    return {'encoder': encoder, 'X': encoder.transform(df), 'y': df['Medal'].to_numpy(), 'index': df.index}
+
+
+def split_stage(encoded: dict, test_size, random_state) -> dict:
+    train_rows, test_rows = train_test_split(np.arange(len(encoded['y'])), test_size=test_size,
+                                             random_state=random_state)
+    return {'train': train_rows, 'test': test_rows}
+
+
+def _frame(encoded: dict, rows):
+    return encoded['encoder'].to_frame(encoded['X'][rows], index=encoded['index'][rows])
+
+
+def fit_stage(encoded: dict, split: dict, n_estimators, max_depth, random_state, n_jobs=-1):
+    model = RandomForestClassifier(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        random_state=random_state,
+        n_jobs=n_jobs
+    )
+    model.fit(_frame(encoded, split['train']), encoded['y'][split['train']])
+    return model
+
+
+def evaluate_stage(encoded: dict, split: dict, model) -> dict:
+    y_pred = model.predict(_frame(encoded, split['test']))
+    return {'accuracy': accuracy_score(encoded['y'][split['test']], y_pred)}
+
+
+def save(bundle: dict, model_path):
+    """Save model + feature names + categorical encodings."""
+    model_path = Path(model_path)
+    # Ensure models directory exists
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so readers see either the old or the new model, never half of one
+    tmp_file = model_path.with_suffix('.tmp')
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(bundle, f)
+    os.replace(tmp_file, model_path)
+    # Directory artifact next to the pickle (models/model/), loaded lazily by the app
+    save_artifact(bundle, model_path.with_suffix(''))
+
+
+# stage -> (upstream stages, parameters that affect its output)
+STAGES = {
+    'profile': (['load'], []),
+    'clean': (['load', 'profile'], ['n_sports', 'n_events', 'n_teams']),
+    'encode': (['clean'], []),
+    'split': (['encode'], ['test_size', 'random_state']),
+    'fit': (['encode', 'split'], ['n_estimators', 'max_depth', 'random_state']),
+    'evaluate': (['encode', 'split', 'fit'], []),
+}
+
+
+def _prune(cache_dir: Path, prefix: str, keep: int):
+    """Delete all but the ``keep`` most recently used ``<prefix>-*`` files."""
+    files = []
+    for path in cache_dir.glob(f'{prefix}-*'):
+        try:
+            files.append((path.stat().st_mtime, path))
+        except OSError:
+            pass
+    for _, stale in sorted(files, reverse=True)[keep:]:
+        try:
+            stale.unlink()
+        except OSError:
+            pass
+
+
+def _digest(*parts) -> str:
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode(), digest_size=8).hexdigest()
+
+
+class Pipeline:
+    """
+    Runs the training stages for one parameter set.
+
+    Stage outputs are resolved lazily: asking for ``evaluate`` loads it from
+    the cache if present, and otherwise resolves (or loads) only the
+    upstream stages it needs. ``report`` lists every stage that was touched.
+    Its peak memory is only measured with ``trace_memory`` (by default, when
+    ``OLYMPICS_METRICS_MEMORY=1``), since tracing slows the stages down.
+    """
+
+    def __init__(self, params=None, data_path=None, df=None, cache_dir=PIPELINE_CACHE_DIR, use_cache=True,
+                 n_jobs=-1, trace_memory=None):
+        self.params = {**DEFAULT_PARAMS, **(params or {})}
+        self.data_path = data_path
+        self.cache_dir = Path(cache_dir)
+        self.use_cache = use_cache
+        self.n_jobs = n_jobs
+        if trace_memory is None:
+            trace_memory = os.environ.get('OLYMPICS_METRICS_MEMORY') == '1'
+        self.trace_memory = trace_memory
+        self.report = []
+        self._outputs = {}
+        self._keys = {}
+        self._in_memory = df is not None
+        if df is not None:
+            self._outputs['load'] = df
+
+    def key(self, stage: str) -> str:
+        if stage not in self._keys:
+            if stage == 'load' and 'load' in self._outputs:
+                # In-memory input (e.g. a benchmark frame): key it by content instead of file hash
+                df = self._outputs['load']
+                self._keys[stage] = _digest('frame', int(pd.util.hash_pandas_object(df, index=True).sum()))
+            elif stage == 'load':
+                self._keys[stage] = dataset_version(self.data_path)
+            else:
+                upstream, params = STAGES[stage]
+                self._keys[stage] = _digest(stage, [self.key(name) for name in upstream],
+                                            {name: self.params[name] for name in params})
+        return self._keys[stage]
+
+    def _cache_file(self, stage: str) -> Path:
+        return self.cache_dir / f'{stage}-{self.key(stage)}.pkl'
+
+    def output(self, stage: str):
+        if stage in self._outputs:
+            return self._outputs[stage]
+
+        path = self._cache_file(stage) if stage != 'load' else None
+        if path is not None and self.use_cache and path.exists():
+            start = time.perf_counter()
+            try:
+                with open(path, 'rb') as f:
+                    result = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                try:
+                    # Mark as recently used, so pruning keeps it
+                    os.utime(path)
+                except OSError:
+                    pass
+                self._record(stage, 'cached', time.perf_counter() - start, float('nan'))
+                self._outputs[stage] = result
+                return result
+
+        # The profile streams the CSV itself; it only needs the rows when they were passed in
+        inputs = [self.output(name) for name in STAGES[stage][0]] if stage not in ('load', 'profile') else []
+        params = {name: self.params[name] for name in STAGES[stage][1]} if stage != 'load' else {}
+        if stage == 'fit':
+            params['n_jobs'] = self.n_jobs
+
+        started = self.trace_memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = self._compute(stage, inputs, params)
+        elapsed = time.perf_counter() - start
+        peak_mb = float('nan')
+        if self.trace_memory:
+            peak_mb = (tracemalloc.get_traced_memory()[1] - baseline) / 2**20
+        if started:
+            # Tracing that was already running (e.g. for metrics) is left on
+            tracemalloc.stop()
+        self._record(stage, 'computed', elapsed, peak_mb)
+
+        if path is not None and self.use_cache:
+            self._write(result, path)
+        self._outputs[stage] = result
+        return result
+
+    def _compute(self, stage, inputs, params):
+        if stage == 'load':
+            return load_athlete_events(self.data_path, columns=FEATURE_COLUMNS + ['Medal'])
+        if stage == 'profile':
+            if self._in_memory:
+                return profile_frame(self._outputs['load'], required=FEATURE_COLUMNS)
+            return load_profile(self.data_path, required=FEATURE_COLUMNS)
+        return {
+            'clean': clean_stage,
+            'encode': encode_stage,
+            'split': split_stage,
+            'fit': fit_stage,
+            'evaluate': evaluate_stage,
+        }[stage](*inputs, **params)
+
+    def _write(self, result, path: Path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = path.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, path)
+        except OSError:
+            return
+        _prune(path.parent, path.name.split('-', 1)[0], KEEP_VERSIONS)
+
+    def _record(self, stage, status, seconds, peak_mb):
+        self.report.append({'stage': stage, 'status': status, 'seconds': seconds, 'peak_mb': peak_mb})
+
+    def bundle(self) -> dict:
+        """The model bundle that is pickled to models/model.pkl."""
+        clean, encoded, model = self.output('clean'), self.output('encode'), self.output('fit')
+        return {
+            'model': model,
+            'encoder': encoded['encoder'],
+            'features': encoded['encoder'].features,
+            'categorical_features': CATEGORICAL_FEATURES,
+            'top_sports': clean['top_sports'],
+            'top_events': clean['top_events'],
+            'top_teams': clean['top_teams'],
+            'n_samples': len(encoded['y']),
+        }
+
+    def run(self, model_path=None):
+        """Resolve every stage, export to ``model_path`` if given; returns (bundle, accuracy)."""
+        accuracy = self.output('evaluate')['accuracy']
+        bundle = self.bundle()
+        if model_path is not None:
+            start = time.perf_counter()
+            save(bundle, model_path)
+            save_profile(self.output('profile'), profile_path(model_path))
+            self._record('export', 'computed', time.perf_counter() - start, float('nan'))
+        return bundle, accuracy
+
+    def report_frame(self) -> pd.DataFrame:
+        """Per-stage status, wall time and peak traced memory, in pipeline order."""
+        order = ['load', *STAGES, 'export']
+        report = pd.DataFrame(self.report, columns=['stage', 'status', 'seconds', 'peak_mb'])
+        return report.sort_values('stage', key=lambda stage: stage.map(order.index), kind='stable')
+
+
+# ---------------- SWEEP ----------------
+_worker_data = {}
+
+
+def _init_worker(x_path, y_path):
+    # Every worker maps the same encoded matrix instead of receiving a pickled copy per task
+    _worker_data['X'] = np.load(x_path, mmap_mode='r')
+    _worker_data['y'] = np.load(y_path, mmap_mode='r')
+
+
+def _cv_task(params, train_rows, test_rows):
+    X, y = _worker_data['X'], _worker_data['y']
+    start = time.perf_counter()
+    model = RandomForestClassifier(**params, n_jobs=1)
+    model.fit(X[train_rows], y[train_rows])
+    accuracy = float((model.predict(X[test_rows]) == y[test_rows]).mean())
+    return {'accuracy': accuracy, 'fit_seconds': time.perf_counter() - start}
+
+
+def sweep(pipeline: Pipeline, grid: dict, folds=5, workers=None) -> pd.DataFrame:
+    """
+    Cross-validate every combination in ``grid`` on the training split.
+
+    ``grid`` maps RandomForestClassifier parameters to lists of values. Tasks
+    (one per combination and fold) run in a process pool; finished tasks are
+    cached, so an interrupted sweep resumes where it stopped.
+    """
+    encoded, split = pipeline.output('encode'), pipeline.output('split')
+    train_rows = split['train']
+    random_state = pipeline.params['random_state']
+    cv_folds = list(StratifiedKFold(folds, shuffle=True, random_state=random_state)
+                    .split(train_rows, encoded['y'][train_rows]))
+
+    cache_dir = pipeline.cache_dir
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    base_key = _digest('cv', pipeline.key('split'), folds)
+    x_path, y_path = cache_dir / f'X-{pipeline.key("encode")}.npy', cache_dir / f'y-{pipeline.key("encode")}.npy'
+    for path, array in [(x_path, encoded['X']), (y_path, encoded['y'])]:
+        if not path.exists():
+            np.save(path, array)
+            # Full copies of the encoded frame: keep only the current one
+            _prune(cache_dir, path.name.split('-', 1)[0], 1)
+
+    combos = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    for params in combos:
+        params.setdefault('random_state', random_state)
+
+    results, pending = [], []
+    for params in combos:
+        for fold, (fit_idx, val_idx) in enumerate(cv_folds):
+            path = cache_dir / f'cv-{_digest(base_key, params, fold)}.json'
+            if path.exists():
+                results.append({**params, 'fold': fold, **json.loads(path.read_text())})
+            else:
+                pending.append((params, fold, train_rows[fit_idx], train_rows[val_idx], path))
+
+    if pending:
+        with ProcessPoolExecutor(workers or os.cpu_count(), initializer=_init_worker,
+                                 initargs=(str(x_path), str(y_path))) as pool:
+            futures = {pool.submit(_cv_task, params, fit_rows, val_rows): (params, fold, path)
+                       for params, fold, fit_rows, val_rows, path in pending}
+            for future in as_completed(futures):
+                params, fold, path = futures[future]
+                result = future.result()
+                path.write_text(json.dumps(result))
+                results.append({**params, 'fold': fold, **result})
+
+    columns = list(combos[0])
+    summary = (pd.DataFrame(results)
+               .groupby(columns, sort=False)
+               .agg(mean_accuracy=('accuracy', 'mean'), std_accuracy=('accuracy', 'std'),
+                    fit_seconds=('fit_seconds', 'mean'))
+               .reset_index()
+               .sort_values('mean_accuracy', ascending=False, ignore_index=True))
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the cached training pipeline or a CV sweep")
+    parser.add_argument('--data', help="athlete_events.csv to train on (default data/athlete_events.csv)")
+    parser.add_argument('--output', default=str(Path('models') / 'model.pkl'))
+    parser.add_argument('--no-cache', action='store_true', help="recompute every stage")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="report each stage's peak memory (several times slower)")
+    for name, value in DEFAULT_PARAMS.items():
+        # Model parameters take several values for --sweep
+        nargs = '+' if name in SWEEP_PARAMS else None
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), nargs=nargs,
+                            default=[value] if nargs else value)
+    parser.add_argument('--sweep', action='store_true',
+                        help="cross-validate every combination of --n-estimators/--max-depth")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, help="sweep processes (default: all cores)")
+    args = parser.parse_args()
+
+    params = {name: getattr(args, name) for name in DEFAULT_PARAMS}
+    grid = {name: params.pop(name) for name in SWEEP_PARAMS}
+    pipeline = Pipeline({**params, **{name: values[0] for name, values in grid.items()}},
+                        data_path=args.data, use_cache=not args.no_cache, trace_memory=args.trace_memory or None)
+
+    if args.sweep:
+        start = time.perf_counter()
+        summary = sweep(pipeline, grid, args.folds, args.workers)
+        print(summary.to_string(float_format=lambda x: f'{x:.4f}'))
+        print(f"\n{len(summary)} combinations x {args.folds} folds in {time.perf_counter() - start:.1f}s")
+    else:
+        bundle, accuracy = pipeline.run(args.output)
+        print(f"Model Accuracy: {accuracy:.4f}")
+        print(f"Total samples: {bundle['n_samples']}")
+        print(f"Features used: {len(bundle['features'])}")
+        print(f"Model saved at: {args.output}")
+
+    print()
+    print(pipeline.report_frame().to_string(index=False, na_rep='-', float_format=lambda x: f'{x:.3f}'))
@@ -1,14 +1,46 @@
 """Prediction module for Olympics data analysis model."""
 
+import argparse
 import pickle
+import sys
+import time
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+import metrics
+from artifact import ModelArtifact, is_artifact
+from dataset import downcast_integers, load_athlete_events, read_csv_typed
+from encoder import FeatureEncoder
+from forest import CompiledForest
+
+INPUT_COLUMNS = ['Age', 'Height', 'Weight', 'Sex', 'Sport', 'Event', 'Team', 'Year']
+
+
+def load_artifact(model_path: str):
+    """
+    Load a model directory (see artifact.py) or the pickled model bundle.
+
+    A directory opens instantly and maps the forest on first use of
+    ``engine``. For a pickle, the fitted feature encoder (rebuilt from the
+    feature names for older bundles) and ``engine``, the forest compiled for
+    fast inference, are added to the bundle.
+    """
+    if is_artifact(model_path):
+        return ModelArtifact(model_path)
 
-def load_model(model_path: str):
-    """Load trained model and feature names."""
     with open(model_path, 'rb') as f:
         data = pickle.load(f)
+    if 'encoder' not in data:
+        # Bundles saved before the encoder existed: rebuild it from the feature names
+        data['encoder'] = FeatureEncoder.from_bundle(data)
+    data['engine'] = CompiledForest.from_sklearn(data['model'])
+    return data
+
+
+def load_model(model_path: str):
+    """Load trained model and feature names (pickled bundles only)."""
+    data = load_artifact(model_path)
     return (data['model'], 
             data['features'], 
             data.get('top_sports', []),
@@ -16,15 +48,14 @@ def load_model(model_path: str):
             data.get('top_teams', []))
 
 
-def preprocess_input(df: pd.DataFrame, features: list, top_sports=None, top_events=None, top_teams=None):
-    """Preprocess input data to match training format."""
-    
-    # Select features and drop rows with missing data
-    df = df[['Age', 'Height', 'Weight', 'Sex', 'Sport', 'Event', 'Team', 'Year']].dropna()
-    
-    if df.empty:
-        raise ValueError("No valid data after preprocessing")
-    
+def select_rows(df: pd.DataFrame, top_sports=None, top_events=None, top_teams=None) -> pd.DataFrame:
+    """
+    Keep the rows the model can score: complete inputs within the training categories.
+
+    The input index is preserved, so results can be joined back to the input rows.
+    """
+    df = downcast_integers(df[INPUT_COLUMNS].dropna())
+
     # Filter by top categories if provided
     if top_sports and len(top_sports) > 0:
         df = df[df['Sport'].isin(top_sports)]
@@ -32,47 +63,174 @@ def preprocess_input(df: pd.DataFrame, features: list, top_sports=None, top_even
         df = df[df['Event'].isin(top_events)]
     if top_teams and len(top_teams) > 0:
         df = df[df['Team'].isin(top_teams)]
+
+    return df
+
+
+@metrics.timed()
+def preprocess_input(df: pd.DataFrame, features: list, top_sports=None, top_events=None, top_teams=None,
+                     encoder: FeatureEncoder = None):
+    """Preprocess input data to match training format."""
+    
+    # Select features and drop rows with missing data
+    df = df[INPUT_COLUMNS].dropna()
+    
+    if df.empty:
+        raise ValueError("No valid data after preprocessing")
+    
+    df = select_rows(df, top_sports, top_events, top_teams)
     
     if df.empty:
         raise ValueError("No data matches the model's training categories")
 
-    # One-hot encoding for categorical variables (match training)
-    df = pd.get_dummies(df, columns=['Sex', 'Sport', 'Event', 'Team'], drop_first=True)
+    encoder = encoder or FeatureEncoder(features)
+    return encoder.to_frame(encoder.transform(df), index=df.index)
 
-    # Ensure all training features exist in prediction data
-    for col in features:
-        if col not in df.columns:
-            df[col] = 0
 
-    # Ensure correct column order and only select training features
-    df = df[features]
+@metrics.timed()
+def score_batch(model, encoder: FeatureEncoder, df: pd.DataFrame, chunk_size: int = 50_000):
+    """
+    Score raw input rows in chunks.
 
-    return df
+    Each chunk is encoded at once and scored with a single ``predict_proba``
+    call; labels are derived from the probabilities the same way
+    ``model.predict`` does. ``model`` is a fitted classifier or the compiled
+    engine from ``load_artifact``. Returns ``(labels, probabilities)`` arrays.
+    """
+    labels, probabilities = [], []
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        proba = model.predict_proba(encoder.to_frame(encoder.transform(chunk)))
+        labels.append(model.classes_.take(proba.argmax(axis=1)))
+        probabilities.append(proba[:, 1])
+
+    if not labels:
+        return np.empty(0, dtype=model.classes_.dtype), np.empty(0)
+    return np.concatenate(labels), np.concatenate(probabilities)
 
 
 def predict(model_path: str, data_path: str):
     """
     Make predictions using trained model.
     """
-    model, features, top_sports, top_events, top_teams = load_model(model_path)
+    data = load_artifact(model_path)
 
-    df = pd.read_csv(data_path)
-    X = preprocess_input(df, features, top_sports, top_events, top_teams)
+    df = load_athlete_events(data_path)
+    X = preprocess_input(df, data['features'], data.get('top_sports'), data.get('top_events'),
+                         data.get('top_teams'), encoder=data['encoder'])
+    predictions, proba = data['engine'].predict_with_proba(X)
+    probabilities = proba[:, 1]  # Get probability of winning medal
 
-    predictions = model.predict(X)
-    probabilities = model.predict_proba(X)[:, 1]  # Get probability of winning medal
-
-    df_result = df[['Age', 'Height', 'Weight', 'Sex', 'Sport', 'Event', 'Team', 'Year']].copy()
-    df_result = df_result.iloc[:len(X)]
+    # Rows dropped by preprocessing have no prediction; align on the index
+    df_result = df.loc[X.index, INPUT_COLUMNS].copy()
     df_result['Medal_Prediction'] = predictions
     df_result['Medal_Probability'] = probabilities
 
     return df_result
 
 
-if __name__ == "__main__":
-    model_path = str(Path("models") / "model.pkl")
-    data_path = str(Path("data") / "athlete_events.csv")
+class PredictionWriter:
+    """Appends prediction chunks to a CSV or Parquet file."""
+
+    def __init__(self, output_path):
+        self.output_path = Path(output_path)
+        self.parquet = self.output_path.suffix.lower() in ('.parquet', '.pq')
+        self._writer = None
+        self._header = True
+
+    def write(self, df: pd.DataFrame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.output_path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            df.to_csv(self.output_path, mode='w' if self._header else 'a',
+                      header=self._header, index=False)
+        self._header = False
+
+    def close(self):
+        if self._header:
+            # No scorable rows at all: still leave an (empty) output file behind
+            self.write(pd.DataFrame(columns=['row_id', *INPUT_COLUMNS,
+                                             'Medal_Prediction', 'Medal_Probability']))
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (NaN where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / (1 << 10)
+
+
+def predict_stream(model_path: str, data_path: str, output_path: str, chunk_size: int = 50_000,
+                   throughput: bool = False):
+    """
+    Score a CSV of any size chunk by chunk and write predictions incrementally.
+
+    Only one chunk is held in memory at a time. Each output row carries
+    ``row_id``, the zero-based position of its input row in the CSV; rows that
+    cannot be scored (missing inputs, categories outside training) are
+    skipped. Returns ``(rows_read, rows_scored)``.
+    """
+    data = load_artifact(model_path)
+    engine, encoder = data['engine'], data['encoder']
+    writer = PredictionWriter(output_path)
+
+    rows_read = rows_scored = 0
+    start = time.perf_counter()
+    try:
+        for chunk in read_csv_typed(data_path, chunksize=chunk_size):
+            rows_read += len(chunk)
+            rows = select_rows(chunk, data.get('top_sports'), data.get('top_events'), data.get('top_teams'))
+            if rows.empty:
+                continue
+
+            labels, proba = engine.predict_with_proba(encoder.transform(rows))
+
+            result = rows.astype({col: object for col in encoder.categorical})
+            result.insert(0, 'row_id', rows.index)
+            result['Medal_Prediction'] = labels
+            result['Medal_Probability'] = proba[:, 1]
+            writer.write(result)
+            rows_scored += len(rows)
+
+            if throughput:
+                elapsed = time.perf_counter() - start
+                print(f'{rows_read:>12,} rows read  {rows_read / elapsed:>12,.0f} rows/s', file=sys.stderr)
+    finally:
+        writer.close()
+
+    if throughput:
+        elapsed = time.perf_counter() - start
+        print(f'Scored {rows_scored:,} of {rows_read:,} rows in {elapsed:.2f}s '
+              f'({rows_read / max(elapsed, 1e-9):,.0f} rows/s, peak RSS {_peak_rss_mb():.0f} MB)',
+              file=sys.stderr)
+
+    return rows_read, rows_scored
 
-    predictions = predict(model_path, data_path)
-    print(predictions.head())
\ No newline at end of file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Predict medals for athlete rows in a CSV file")
+    parser.add_argument('--model', default=str(Path("models") / "model"),
+                        help="model directory or pickled bundle")
+    parser.add_argument('--input', default=str(Path("data") / "athlete_events.csv"))
+    parser.add_argument('--output', help="stream predictions to this .csv or .parquet file")
+    parser.add_argument('--chunksize', type=int, default=50_000, help="rows per chunk in streaming mode")
+    parser.add_argument('--throughput', action='store_true', help="report rows per second while streaming")
+    args = parser.parse_args()
+
+    if args.output:
+        predict_stream(args.model, args.input, args.output, args.chunksize, args.throughput)
+    else:
+        predictions = predict(args.model, args.input)
+        print(predictions.head())
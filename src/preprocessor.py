@@ -1,10 +1,85 @@
+import numpy as np
 import pandas as pd
 
-def preprocess(df, region_df):
+import metrics
+
+@metrics.timed()
+def preprocess(df, region_df, compact=False):
+    if compact:
+        return preprocess_compact(df, region_df)
+
     df = df[df['Season'] == 'Summer'].copy()
     df = df.merge(region_df, on='NOC', how='left')
     df = df.drop_duplicates()
 
     df = pd.concat([df, pd.get_dummies(df['Medal'])], axis=1)
 
-    return df
\ No newline at end of file
+    return df
+
+def preprocess_compact(df, region_df):
+    # Same rows (renumbered from 0) and columns as preprocess(), but strings
+    # become categoricals, numerics are downcast and the Gold/Silver/Bronze
+    # indicators are uint8. Rows are gathered once; region columns are mapped
+    # instead of merged.
+    if not region_df['NOC'].is_unique:
+        # Duplicate NOCs multiply rows in the merge; keep its exact semantics
+        return compact_frame(preprocess(df, region_df))
+
+    summer = (df['Season'] == 'Summer').to_numpy()
+    # Season is a column, so a Summer row can only duplicate an earlier Summer row
+    keep = summer & ~df.duplicated().to_numpy()
+    rows = np.flatnonzero(keep)
+    index = pd.RangeIndex(len(rows))
+
+    columns = {col: _compact_series(df[col].iloc[rows], index) for col in df.columns}
+
+    noc = df['NOC'].iloc[rows]
+    regions = region_df.set_index('NOC')
+    for col in regions.columns:
+        columns[col] = _compact_series(noc.map(regions[col]), index)
+
+    medal = columns['Medal']
+    for name in sorted(medal.dropna().unique()):
+        columns[name] = pd.Series((medal == name).to_numpy(np.uint8), index=index)
+
+    return pd.DataFrame(columns, index=index, copy=False)
+
+def compact_frame(df):
+    return pd.DataFrame({col: _compact_series(df[col], df.index) for col in df.columns},
+                        index=df.index, copy=False)
+
+def _compact_series(series, index):
+    values = series.array
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        values = values.remove_unused_categories()
+    elif pd.api.types.is_bool_dtype(series.dtype):
+        values = series.to_numpy(np.uint8)
+    elif pd.api.types.is_float_dtype(series.dtype):
+        values = pd.to_numeric(series, downcast='float').array
+    elif pd.api.types.is_integer_dtype(series.dtype):
+        values = pd.to_numeric(series, downcast='integer').array
+    elif pd.api.types.is_string_dtype(series.dtype):
+        values = pd.Categorical(series)
+    return pd.Series(values, index=index, name=series.name, copy=False)
+
+def memory_report(df):
+    # Deep per-column memory (object strings included), largest first
+    usage = df.memory_usage(deep=True)
+    report = pd.DataFrame({
+        'dtype': [str(df[col].dtype) if col in df.columns else type(df.index).__name__ for col in usage.index],
+        'bytes': usage.to_numpy(),
+    }, index=usage.index)
+    report = report.sort_values('bytes', ascending=False)
+    report['MB'] = report['bytes'] / 2**20
+    report['share'] = report['bytes'] / report['bytes'].sum()
+    report.loc['total'] = ['', report['bytes'].sum(), report['MB'].sum(), 1.0]
+    return report
+
+if __name__ == '__main__':
+    from dataset import load_athlete_events, load_regions
+
+    athletes, regions = load_athlete_events(), load_regions()
+    for compact in (False, True):
+        report = memory_report(preprocess(athletes, regions, compact=compact))
+        print(f"\npreprocess(compact={compact}): {report.loc['total', 'MB']:.1f} MB per cached copy")
+        print(report.to_string(float_format=lambda x: f'{x:.3f}'))
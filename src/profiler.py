@@ -0,0 +1,309 @@
+"""Single-pass, bounded-memory profile of athlete_events.csv.
+
+The CSV is read in chunks, and every column keeps running statistics:
+row and null counts, the numeric range, mean and spread, a distinct count,
+and its most frequent values. Value counts are exact until a column has
+``exact_limit`` distinct values. Past that point the column switches to
+sketches, so memory stays bounded however large the file grows:
+
+* distinct values are estimated with a HyperLogLog sketch, about 1% error;
+* the most frequent values come from a Misra-Gries summary. Reported counts
+  are lower bounds, off by at most ``top_error`` each.
+
+With ``required`` columns, those columns are also profiled under
+``complete``, counting only the rows that have all of them. For the feature
+columns those are exactly the rows training keeps, so the pipeline reads its
+top sports, events and teams from there instead of counting the cleaned
+frame again. The profile is cached as JSON next to the Parquet cache, and
+training saves a copy next to the model.
+
+    python src/profiler.py                        # summary table
+    python src/profiler.py --output profile.json  # full profile
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from dataset import ATHLETE_EVENTS_PATH, CACHE_DIR, DTYPES, INTEGER_COLUMNS, dataset_version
+
+FORMAT_VERSION = 1
+CHUNK_ROWS = 100_000
+# Most frequent values stored per column
+TOP_K = 100
+# Distinct values a column counts exactly before switching to sketches
+EXACT_LIMIT = 50_000
+# Values tracked by the Misra-Gries summary once a column is sketched
+SUMMARY_SIZE = 1_000
+# HyperLogLog registers: 2**14, about 0.8% standard error
+HLL_PRECISION = 14
+
+
+def ranked_counts(counts: pd.Series) -> pd.Series:
+    """Non-zero counts, most frequent first; ties in value order, so the ranking is reproducible."""
+    counts = counts[counts > 0]
+    return counts.sort_index(kind='stable').sort_values(ascending=False, kind='stable')
+
+
+def _hll_estimate(registers: np.ndarray) -> float:
+    m = len(registers)
+    raw = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * m and zeros:
+        # Small cardinalities: linear counting is more accurate
+        return m * np.log(m / zeros)
+    return float(raw)
+
+
+def _json_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ColumnProfile:
+    """Running statistics of one column, fed chunk by chunk."""
+
+    def __init__(self, exact_limit=EXACT_LIMIT, summary_size=SUMMARY_SIZE):
+        self.exact_limit = exact_limit
+        self.summary_size = summary_size
+        self.count = 0
+        self.nulls = 0
+        self.numeric = None
+        self.min = self.max = None
+        self.total = self.total_squares = 0.0
+        self.counts = pd.Series(dtype='int64')
+        self.exact = True
+        # Total subtracted by the Misra-Gries summary: no count is low by more than this
+        self.error = 0
+        self.registers = np.zeros(1 << HLL_PRECISION, dtype=np.uint8)
+
+    def update(self, values: pd.Series):
+        self.count += len(values)
+        present = values.dropna()
+        self.nulls += len(values) - len(present)
+        if self.numeric is None:
+            self.numeric = pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype)
+        if self.numeric and len(present):
+            numbers = present.to_numpy(np.float64)
+            low, high = numbers.min(), numbers.max()
+            self.min = low if self.min is None else min(self.min, low)
+            self.max = high if self.max is None else max(self.max, high)
+            self.total += numbers.sum()
+            self.total_squares += np.square(numbers).sum()
+
+        chunk_counts = present.value_counts(sort=False)
+        chunk_counts = chunk_counts[chunk_counts > 0]
+        if not self.exact:
+            self._add_hashes(chunk_counts.index)
+            # A chunk's counts are a summary too; shrinking them first keeps the merge small
+            chunk_counts = self._shrink(chunk_counts)
+        self.counts = self.counts.add(chunk_counts, fill_value=0).astype('int64')
+        if self.exact and len(self.counts) > self.exact_limit:
+            # Switch to sketches, seeded with every value counted so far
+            self.exact = False
+            self._add_hashes(self.counts.index)
+        if not self.exact:
+            self.counts = self._shrink(self.counts)
+
+    def _shrink(self, counts: pd.Series) -> pd.Series:
+        # Misra-Gries: subtract the (size + 1)-th largest count from every counter
+        if len(counts) <= self.summary_size:
+            return counts
+        threshold = int(counts.nlargest(self.summary_size + 1).iloc[-1])
+        self.error += threshold
+        return counts[counts > threshold] - threshold
+
+    def _add_hashes(self, values: pd.Index):
+        hashes = pd.util.hash_array(values.to_numpy())
+        width = 64 - HLL_PRECISION
+        buckets = (hashes >> np.uint64(width)).astype(np.intp)
+        rest = hashes & np.uint64((1 << width) - 1)
+        # Position of the first set bit in the remaining 50 bits; exact, as they fit in a float64
+        rank = width - np.frexp(rest.astype(np.float64))[1] + 1
+        np.maximum.at(self.registers, buckets, rank.astype(np.uint8))
+
+    def result(self, top_k=TOP_K) -> dict:
+        top = ranked_counts(self.counts).head(top_k)
+        result = {
+            'count': self.count,
+            'nulls': self.nulls,
+            'null_rate': self.nulls / self.count if self.count else 0.0,
+            'distinct': len(self.counts) if self.exact else round(_hll_estimate(self.registers)),
+            'distinct_exact': self.exact,
+            'top': [[_json_value(value), int(count)] for value, count in top.items()],
+            # Every value with a non-zero count is listed
+            'top_complete': self.exact and len(top) == len(self.counts),
+            'top_error': self.error,
+        }
+        if self.numeric:
+            present = self.count - self.nulls
+            mean = self.total / present if present else None
+            result.update({
+                'min': _json_value(self.min),
+                'max': _json_value(self.max),
+                'mean': mean,
+                'std': float(np.sqrt(max(self.total_squares / present - mean ** 2, 0.0))) if present else None,
+            })
+        return result
+
+
+class Profiler:
+    """
+    Column profiles of every chunk passed to ``update``.
+
+    With ``required`` columns, those columns are profiled again under
+    ``complete``, over the rows that have all of them.
+    """
+
+    def __init__(self, top_k=TOP_K, exact_limit=EXACT_LIMIT, required=None):
+        self.top_k = top_k
+        self.exact_limit = exact_limit
+        self.required = list(required) if required else None
+        self.rows = 0
+        self.chunks = 0
+        self.columns = {}
+        self.complete = Profiler(top_k, exact_limit) if required else None
+
+    def update(self, chunk: pd.DataFrame):
+        self.rows += len(chunk)
+        self.chunks += 1
+        for col in chunk.columns:
+            if col not in self.columns:
+                self.columns[col] = ColumnProfile(self.exact_limit)
+            self.columns[col].update(chunk[col])
+        if self.complete is not None:
+            self.complete.update(chunk[self.required].dropna())
+
+    def result(self) -> dict:
+        result = {
+            'format_version': FORMAT_VERSION,
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'columns': {col: column.result(self.top_k) for col, column in self.columns.items()},
+        }
+        if self.complete is not None:
+            complete = self.complete.result()
+            result['complete'] = {'required': self.required, 'rows': complete['rows'],
+                                  'columns': complete['columns']}
+        return result
+
+
+def profile_frame(df: pd.DataFrame, chunk_rows=CHUNK_ROWS, required=None, top_k=TOP_K,
+                  exact_limit=EXACT_LIMIT) -> dict:
+    """Profile of an in-memory frame, built the same way as from the CSV."""
+    profiler = Profiler(top_k, exact_limit, required)
+    for start in range(0, len(df), chunk_rows):
+        profiler.update(df.iloc[start:start + chunk_rows])
+    return profiler.result()
+
+
+@metrics.timed(rows=lambda args, result: result['rows'])
+def profile_csv(path=None, chunk_rows=CHUNK_ROWS, required=None, top_k=TOP_K, exact_limit=EXACT_LIMIT) -> dict:
+    """Profile an athlete_events-shaped CSV in one pass of ``chunk_rows`` rows at a time."""
+    path = Path(path) if path else ATHLETE_EVENTS_PATH
+    header = pd.read_csv(path, nrows=0).columns
+    # Strings stay plain objects: chunks would each infer their own categories,
+    # and counting objects is cheaper than converting them to Arrow strings.
+    # Integers are nullable, so every chunk counts them with the same type.
+    dtypes = {col: object if dtype == 'category' else dtype for col, dtype in DTYPES.items() if col in header}
+    dtypes.update({col: dtype.capitalize() for col, dtype in INTEGER_COLUMNS.items() if col in header})
+    start = time.perf_counter()
+    profiler = Profiler(top_k, exact_limit, required)
+    with pd.read_csv(path, dtype=dtypes, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            profiler.update(chunk)
+    result = profiler.result()
+    result.update({'source': path.name, 'dataset_version': dataset_version(path),
+                   'seconds': time.perf_counter() - start})
+    return result
+
+
+def save_profile(profile: dict, path):
+    """Write ``profile`` as JSON atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_suffix('.tmp')
+    tmp_file.write_text(json.dumps(profile, indent=1))
+    os.replace(tmp_file, path)
+
+
+def profile_path(model_path) -> Path:
+    """Where training saves the profile of its data: models/model.profile.json for models/model.pkl."""
+    model_path = Path(model_path)
+    return model_path.with_name(f'{model_path.stem}.profile.json')
+
+
+def load_profile(path=None, required=None) -> dict:
+    """
+    Profile of the dataset, streamed from the CSV on first use.
+
+    Cached as JSON under data/.cache, keyed by the file's content hash and
+    the ``required`` columns.
+    """
+    path = Path(path) if path else ATHLETE_EVENTS_PATH
+    variant = hashlib.blake2b(json.dumps(required).encode(), digest_size=4).hexdigest()
+    cache_file = CACHE_DIR / f'{path.stem}-profile-v{FORMAT_VERSION}-{dataset_version(path)}-{variant}.json'
+    if cache_file.exists():
+        try:
+            return json.loads(cache_file.read_text())
+        except (OSError, ValueError):
+            pass
+
+    profile = profile_csv(path, required=required)
+    try:
+        save_profile(profile, cache_file)
+    except OSError:
+        pass
+    return profile
+
+
+def top_values(profile: dict, column: str, n: int, complete=True):
+    """
+    The ``n`` most frequent values of ``column``, as ``value_counts().head(n)``
+    would rank them; None if the profile cannot answer exactly (the column was
+    sketched, or more than the stored values are asked for).
+    """
+    section = profile['complete'] if complete else profile
+    stats = section['columns'][column]
+    if not stats['distinct_exact'] or (n > len(stats['top']) and not stats['top_complete']):
+        return None
+    return [value for value, _ in stats['top'][:n]]
+
+
+def _summary(profile: dict) -> pd.DataFrame:
+    rows = []
+    for col, stats in profile['columns'].items():
+        rows.append({
+            'column': col,
+            'null %': 100 * stats['null_rate'],
+            'distinct': f"{stats['distinct']:,}" + ('' if stats['distinct_exact'] else ' (est.)'),
+            'min': stats.get('min'),
+            'max': stats.get('max'),
+            'most frequent': ', '.join(f'{str(value)[:24]} ({count:,})' for value, count in stats['top'][:3]),
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Profile athlete_events.csv in one streaming pass")
+    parser.add_argument('--data', help="CSV to profile (default data/athlete_events.csv)")
+    parser.add_argument('--output', help="write the full profile as JSON")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--top-k', type=int, default=TOP_K)
+    args = parser.parse_args()
+
+    profile = profile_csv(args.data, args.chunk_rows, top_k=args.top_k)
+    summary = _summary(profile)
+    width = summary['most frequent'].str.len().max()
+    print(summary.to_string(index=False, na_rep='-', float_format=lambda x: f'{x:g}', justify='left',
+                            formatters={'most frequent': lambda text: text.ljust(width)}))
+    print(f"\n{profile['rows']:,} rows in {profile['chunks']} chunks, {profile['seconds']:.2f}s")
+    if args.output:
+        save_profile(profile, args.output)
+        print(f"Profile saved at: {args.output}")
@@ -0,0 +1,263 @@
+"""Standalone HTTP scoring service for the medal prediction model.
+
+The model is loaded once at startup. Single-athlete requests that arrive within
+a few milliseconds of each other are merged by a micro-batcher into one
+vectorized ``predict_proba`` call.
+
+    python src/serve.py --port 8502
+
+Endpoints:
+    POST /predict        one athlete as a JSON object with Age, Height, Weight,
+                         Sex, Sport, Event, Team and Year
+    POST /predict/batch  a JSON list of athletes (or {"records": [...]})
+    GET  /health         model and batching status
+    GET  /latency        server-side latency percentiles per endpoint
+    GET  /metrics        instrumented hot paths in Prometheus text format
+    GET  /metrics.json   the same as JSON
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from predict import INPUT_COLUMNS, load_artifact, score_batch
+
+NUMERIC_COLUMNS = ['Age', 'Height', 'Weight', 'Year']
+
+
+def parse_record(record) -> dict:
+    """Validate one athlete record, returning it with numeric fields as floats."""
+    if not isinstance(record, dict):
+        raise ValueError("each record must be a JSON object")
+    missing = [col for col in INPUT_COLUMNS if col not in record]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+
+    parsed = {col: str(record[col]) for col in INPUT_COLUMNS if col not in NUMERIC_COLUMNS}
+    for col in NUMERIC_COLUMNS:
+        try:
+            parsed[col] = float(record[col])
+        except (TypeError, ValueError):
+            raise ValueError(f"{col} must be a number") from None
+    return parsed
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-record requests into small batches.
+
+    The worker blocks for the first request, then keeps collecting for up to
+    ``max_wait`` seconds or ``max_batch`` records and scores them together.
+    """
+
+    def __init__(self, engine, encoder, max_wait=0.002, max_batch=256):
+        self.engine = engine
+        self.encoder = encoder
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.batches = 0
+        self.records = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict) -> Future:
+        future = Future()
+        self._queue.put((record, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._score(batch)
+
+    def _score(self, batch):
+        records = [record for record, _ in batch]
+        try:
+            labels, proba = self.engine.predict_with_proba(self.encoder.transform_records(records))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.records += len(batch)
+        for (_, future), label, probability in zip(batch, labels, proba[:, 1]):
+            future.set_result({'medal': int(label), 'probability': float(probability)})
+
+
+class LatencyTracker:
+    """Keeps the most recent request latencies per endpoint."""
+
+    def __init__(self, window=10_000):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = {endpoint: np.array(values) * 1e3 for endpoint, values in self._samples.items()}
+        return {
+            endpoint: {
+                'count': len(ms),
+                'p50_ms': float(np.percentile(ms, 50)),
+                'p90_ms': float(np.percentile(ms, 90)),
+                'p99_ms': float(np.percentile(ms, 99)),
+                'max_ms': float(ms.max()),
+            }
+            for endpoint, ms in samples.items()
+        }
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Bursts of new keep-alive clients would otherwise overflow the default backlog of 5
+    request_queue_size = 128
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; Nagle would delay keep-alive replies
+    disable_nagle_algorithm = True
+
+    # Set on the server by make_server
+    @property
+    def app(self):
+        return self.server.app
+
+    def log_message(self, format, *args):
+        if self.app['verbose']:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def do_GET(self):
+        start = time.perf_counter()
+        if self.path == '/health':
+            batcher = self.app['batcher']
+            self._send_json(200, {
+                'status': 'ok',
+                'features': len(self.app['encoder'].features),
+                'trees': self.app['engine'].n_trees,
+                'batches': batcher.batches,
+                'mean_batch_size': batcher.records / batcher.batches if batcher.batches else 0.0,
+            })
+        elif self.path == '/latency':
+            self._send_json(200, self.app['latency'].summary())
+        elif self.path == '/metrics.json':
+            self._send_json(200, metrics.snapshot())
+        elif self.path == '/metrics':
+            body = metrics.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {'error': f'unknown endpoint {self.path}'})
+            return
+        self.app['latency'].record(self.path, time.perf_counter() - start)
+
+    def do_POST(self):
+        start = time.perf_counter()
+        try:
+            payload = self._read_json()
+            if self.path == '/predict':
+                result = self.app['batcher'].submit(parse_record(payload)).result()
+            elif self.path == '/predict/batch':
+                result = self._predict_batch(payload)
+            else:
+                self._send_json(404, {'error': f'unknown endpoint {self.path}'})
+                return
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+
+        self._send_json(200, result)
+        self.app['latency'].record(self.path, time.perf_counter() - start)
+
+    def _predict_batch(self, payload):
+        records = payload.get('records') if isinstance(payload, dict) else payload
+        if not isinstance(records, list):
+            raise ValueError("expected a JSON list of records or {\"records\": [...]}")
+
+        df = pd.DataFrame([parse_record(record) for record in records], columns=INPUT_COLUMNS)
+        labels, probabilities = score_batch(self.app['engine'], self.app['encoder'], df)
+        return {
+            'predictions': [
+                {'medal': int(label), 'probability': float(probability)}
+                for label, probability in zip(labels, probabilities)
+            ]
+        }
+
+
+def make_server(model_path: str, host: str = '127.0.0.1', port: int = 8502,
+                max_wait: float = 0.002, max_batch: int = 256, verbose: bool = False):
+    """Load the model once and build the (not yet started) HTTP server."""
+    data = load_artifact(model_path)
+    server = ScoringServer((host, port), ScoringHandler)
+    server.app = {
+        'engine': data['engine'],
+        'encoder': data['encoder'],
+        'batcher': MicroBatcher(data['engine'], data['encoder'], max_wait, max_batch),
+        'latency': LatencyTracker(),
+        'verbose': verbose,
+    }
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve medal predictions over HTTP")
+    parser.add_argument('--model', default=str(Path(__file__).parent.parent / 'models' / 'model'),
+                        help="model directory or pickled bundle")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help="how long the micro-batcher waits for more requests")
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args()
+
+    server = make_server(args.model, args.host, args.port, args.max_wait_ms / 1e3, args.max_batch,
+                         args.verbose)
+    print(f"Serving predictions on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,152 @@
+"""Read-only, memory-mapped copy of the preprocessed analytics frame.
+
+The compact frame from ``preprocessor.preprocess(..., compact=True)`` is
+written once per dataset version under data/.cache/shared. Each column is
+stored as one .npy file, and categoricals are stored as their codes plus a
+JSON list of categories. ``open_frame`` maps those files read-only and wraps
+them in a DataFrame without copying. Every session in a server process gets
+the same frame, and every server process on the host reads the same pages
+from the OS page cache, so memory stays flat as sessions and replicas are
+added. Writing into the frame raises; derive a copy instead.
+
+    python src/shared_frame.py          # build it ahead of time
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import preprocessor
+from dataset import ATHLETE_EVENTS_PATH, CACHE_DIR, NOC_REGIONS_PATH, dataset_version, load_athlete_events, load_regions
+
+FORMAT_VERSION = 1
+SHARED_DIR = CACHE_DIR / 'shared'
+
+
+def frame_version(athletes_path=None, regions_path=None) -> str:
+    """Changes whenever either source file or the stored layout changes."""
+    athletes = dataset_version(athletes_path or ATHLETE_EVENTS_PATH)
+    regions = dataset_version(regions_path or NOC_REGIONS_PATH)
+    return f'v{FORMAT_VERSION}-{athletes}-{regions}'
+
+
+def save_frame(df: pd.DataFrame, directory):
+    """
+    Write ``df`` as a directory of .npy columns and a meta.json header.
+
+    The directory is built under a temporary name and renamed into place, so
+    readers never see a partial frame. If another process published the same
+    directory first, its copy is kept.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = directory.with_name(f'.{directory.name}-{uuid.uuid4().hex[:12]}')
+    tmp_dir.mkdir()
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        entry = {'name': col, 'file': f'{i:03d}.npy'}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(tmp_dir / entry['file'], series.array.codes)
+            entry['categories'] = f'{i:03d}.json'
+            entry['ordered'] = bool(series.dtype.ordered)
+            with open(tmp_dir / entry['categories'], 'w') as f:
+                json.dump(series.dtype.categories.tolist(), f)
+        else:
+            values = series.to_numpy()
+            if values.dtype == object:
+                raise TypeError(f"column {col!r} must be numeric or categorical to be memory-mapped")
+            np.save(tmp_dir / entry['file'], values)
+        columns.append(entry)
+
+    index = 'range'
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        index = 'index.npy'
+        np.save(tmp_dir / index, df.index.to_numpy())
+
+    with open(tmp_dir / 'meta.json', 'w') as f:
+        json.dump({'format_version': FORMAT_VERSION, 'rows': len(df), 'index': index, 'columns': columns}, f)
+    try:
+        os.rename(tmp_dir, directory)
+    except OSError:
+        # Published concurrently by another process
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not (directory / 'meta.json').exists():
+            raise
+
+
+def open_frame(directory, mmap_mode='r') -> pd.DataFrame:
+    """Map a frame written by ``save_frame``; columns are views of the files."""
+    directory = Path(directory)
+    with open(directory / 'meta.json') as f:
+        meta = json.load(f)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"unsupported shared frame format: {meta.get('format_version')}")
+
+    columns = {}
+    for entry in meta['columns']:
+        # A plain ndarray view: memmap results would otherwise propagate into every derived frame
+        values = np.asarray(np.load(directory / entry['file'], mmap_mode=mmap_mode))
+        if 'categories' in entry:
+            with open(directory / entry['categories']) as f:
+                dtype = pd.CategoricalDtype(json.load(f), ordered=entry['ordered'])
+            values = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+        columns[entry['name']] = values
+
+    if meta['index'] == 'range':
+        index = pd.RangeIndex(meta['rows'])
+    else:
+        index = pd.Index(np.asarray(np.load(directory / meta['index'], mmap_mode=mmap_mode)))
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def _prune(keep: Path):
+    for stale in keep.parent.glob('summer-*'):
+        if stale != keep:
+            # Processes that still map the old files keep them until they close
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def load_shared_frame(athletes_path=None, regions_path=None, shared_dir=None, cache_dir=None) -> pd.DataFrame:
+    """
+    The preprocessed Summer frame, memory-mapped from data/.cache/shared.
+
+    Built from the source files on first use for a dataset version. On a
+    read-only checkout, the freshly preprocessed frame is returned instead.
+    The CSV's Parquet cache goes to ``cache_dir``; it defaults to
+    ``shared_dir`` when that is given, so a frame built elsewhere never
+    touches (or prunes) the caches under data/.cache.
+    """
+    directory = Path(shared_dir or SHARED_DIR) / f'summer-{frame_version(athletes_path, regions_path)}'
+    if not (directory / 'meta.json').exists():
+        athletes = load_athlete_events(athletes_path, cache_dir=cache_dir or shared_dir)
+        df = preprocessor.preprocess(athletes, load_regions(regions_path), compact=True)
+        try:
+            save_frame(df, directory)
+        except OSError:
+            return df
+        _prune(directory)
+    return open_frame(directory)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the shared memory-mapped analytics frame")
+    parser.add_argument('--force', action='store_true', help="rebuild even if it is up to date")
+    args = parser.parse_args()
+
+    directory = SHARED_DIR / f'summer-{frame_version()}'
+    if args.force:
+        shutil.rmtree(directory, ignore_errors=True)
+    start = time.perf_counter()
+    df = load_shared_frame()
+    size = sum(path.stat().st_size for path in directory.iterdir())
+    print(f"{len(df):,} rows x {df.shape[1]} columns at {directory} ({size / 2**20:.1f} MB) "
+          f"in {time.perf_counter() - start:.2f}s")
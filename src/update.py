@@ -0,0 +1,133 @@
+"""Incremental model update for newly arrived Games data.
+
+Instead of retraining on the whole history, a small forest is fitted on the
+new rows only and its trees are added to the existing model, or replace the
+oldest trees (``--replace-oldest``) to keep the forest size fixed. Sports,
+events and teams that are frequent in the new rows join the stored top
+categories. Categories never seen before are appended to the encoder's
+vocabulary, so the existing trees keep reading the same feature columns.
+
+    python src/update.py --new-data data/athlete_events.csv --years 2016 --trees 10
+
+Both models/model.pkl and the models/model/ artifact are replaced atomically.
+"""
+
+import argparse
+import copy
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from dataset import read_csv_typed
+from encoder import FeatureEncoder
+from pipeline import DEFAULT_PARAMS, clean_rows, save, select_top, top_categories
+
+
+def _union(existing, new) -> list:
+    existing = list(existing)
+    seen = set(existing)
+    return existing + [value for value in new if value not in seen]
+
+
+def update_model(bundle: dict, df: pd.DataFrame, n_trees=10, replace_oldest=False, random_state=42,
+                 n_jobs=-1) -> dict:
+    """
+    Return a new bundle with ``n_trees`` trees fitted on the raw rows ``df``.
+
+    The input bundle is not modified. The new trees use the existing forest's
+    ``max_depth``. Raises ValueError if the new rows cannot be fitted (none
+    left after cleaning, or only one class).
+    """
+    model = bundle['model']
+    encoder = FeatureEncoder.from_bundle(bundle)
+
+    rows = clean_rows(df)
+    new_sports, new_events, new_teams = top_categories(
+        rows, DEFAULT_PARAMS['n_sports'], DEFAULT_PARAMS['n_events'], DEFAULT_PARAMS['n_teams'])
+    top_sports = _union(bundle.get('top_sports') or [], new_sports)
+    top_events = _union(bundle.get('top_events') or [], new_events)
+    top_teams = _union(bundle.get('top_teams') or [], new_teams)
+    rows = select_top(rows, top_sports, top_events, top_teams)
+
+    if rows.empty:
+        raise ValueError("no complete rows in the new data")
+    if rows['Medal'].nunique() < len(model.classes_):
+        raise ValueError("the new rows must contain both medal winners and non-winners")
+    if replace_oldest and n_trees > len(model.estimators_):
+        raise ValueError(f"cannot replace {n_trees} trees in a forest of {len(model.estimators_)}")
+
+    n_features = len(encoder.features)
+    encoder = encoder.extend(rows)
+    X = encoder.to_frame(encoder.transform(rows), index=rows.index)
+
+    new_forest = RandomForestClassifier(
+        n_estimators=n_trees,
+        max_depth=model.max_depth,
+        random_state=random_state,
+        n_jobs=n_jobs
+    )
+    new_forest.fit(X, rows['Medal'])
+
+    # Graft the new trees onto a copy of the forest. Old trees only index the
+    # leading features, so they predict unchanged on the wider matrix.
+    kept = model.estimators_[n_trees:] if replace_oldest else model.estimators_
+    estimators = [copy.copy(tree) for tree in kept] + new_forest.estimators_
+    for tree in estimators:
+        tree.n_features_in_ = len(encoder.features)
+
+    updated = copy.copy(model)
+    updated.estimators_ = estimators
+    updated.n_estimators = len(estimators)
+    updated.n_features_in_ = len(encoder.features)
+    updated.feature_names_in_ = np.array(encoder.features, dtype=object)
+
+    bundle = {key: value for key, value in bundle.items() if key != 'engine'}
+    bundle.update({
+        'model': updated,
+        'encoder': encoder,
+        'features': encoder.features,
+        'top_sports': top_sports,
+        'top_events': top_events,
+        'top_teams': top_teams,
+        'n_samples': bundle.get('n_samples', 0) + len(rows),
+        'updates': bundle.get('updates', []) + [{
+            'rows': len(rows),
+            'trees_added': n_trees,
+            'replaced_oldest': replace_oldest,
+            'new_features': len(encoder.features) - n_features,
+        }],
+    })
+    return bundle
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Add trees fitted on new Games data to the model")
+    parser.add_argument('--model', default=str(Path('models') / 'model.pkl'))
+    parser.add_argument('--new-data', required=True, help="CSV with the new athlete rows")
+    parser.add_argument('--years', type=int, nargs='+', help="only use rows from these years")
+    parser.add_argument('--trees', type=int, default=10, help="trees to fit on the new rows")
+    parser.add_argument('--replace-oldest', action='store_true',
+                        help="drop as many of the oldest trees as are added")
+    parser.add_argument('--output', help="where to write the updated model (default: --model)")
+    args = parser.parse_args()
+
+    with open(args.model, 'rb') as f:
+        bundle = pickle.load(f)
+    df = read_csv_typed(args.new_data)
+    if args.years:
+        df = df[df['Year'].isin(args.years)]
+
+    start = time.perf_counter()
+    updated = update_model(bundle, df, args.trees, args.replace_oldest)
+    save(updated, args.output or args.model)
+
+    update = updated['updates'][-1]
+    print(f"Fitted {update['trees_added']} trees on {update['rows']} new rows in "
+          f"{time.perf_counter() - start:.2f}s")
+    print(f"Forest: {updated['model'].n_estimators} trees, {len(updated['features'])} features "
+          f"({update['new_features']} new)")
+    print(f"Model saved at: {args.output or args.model}")
@@ -0,0 +1,92 @@
+"""What-if sweeps and cached single-point scoring for the Manual Entry form.
+
+A sweep varies one or two inputs of an athlete over their whole range while
+the other inputs stay fixed. The grid is encoded as one matrix and scored
+with a single ``predict_proba`` call. ``CachedScorer`` remembers the
+probabilities of recently scored feature vectors, so a form submitted again
+with the same values needs no model call.
+
+    axes = sweep_axes('Age × Weight', teams)
+    grid = score_sweep(engine, encoder, record, axes)   # Age, Weight, Probability
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+# Slider ranges of the numeric inputs: (min, max, step)
+RANGES = {
+    'Age': (10, 80, 1),
+    'Height': (140, 230, 1),
+    'Weight': (40, 200, 1),
+    'Year': (1896, 2024, 4),
+}
+
+# Sweep label -> the inputs it varies
+SWEEPS = {
+    'Age': ['Age'],
+    'Height': ['Height'],
+    'Weight': ['Weight'],
+    'Year': ['Year'],
+    'Team': ['Team'],
+    'Age × Weight': ['Age', 'Weight'],
+    'Height × Weight': ['Height', 'Weight'],
+}
+
+
+def sweep_axes(name: str, teams) -> dict:
+    """Values of every input the sweep varies: the full slider range, or every team."""
+    axes = {}
+    for col in SWEEPS[name]:
+        if col == 'Team':
+            axes[col] = list(teams)
+        else:
+            low, high, step = RANGES[col]
+            axes[col] = list(range(low, high + 1, step))
+    return axes
+
+
+@metrics.timed(rows=lambda args, result: len(result))
+def score_sweep(model, encoder, record: dict, axes: dict) -> pd.DataFrame:
+    """One row per grid point: the swept inputs and the medal ``Probability``."""
+    X = encoder.transform_grid(record, axes)
+    proba = model.predict_proba(X)
+    grid = pd.MultiIndex.from_product(list(axes.values()), names=list(axes)).to_frame(index=False)
+    grid['Probability'] = proba[:, list(model.classes_).index(1)]
+    return grid
+
+
+class CachedScorer:
+    """
+    ``predict_proba`` for single encoded rows behind an LRU keyed by the
+    row's bytes; thread-safe, so one instance can serve every session.
+    """
+
+    def __init__(self, model, maxsize=4096):
+        self.model = model
+        self.maxsize = maxsize
+        self.classes_ = model.classes_
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Probabilities for a (1, n_features) matrix."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        key = X.tobytes()
+        with self._lock:
+            proba = self._cache.get(key)
+            if proba is not None:
+                self._cache.move_to_end(key)
+        metrics.count_cache('whatif.CachedScorer', proba is not None)
+        if proba is None:
+            proba = self.model.predict_proba(X)
+            proba.setflags(write=False)
+            with self._lock:
+                self._cache[key] = proba
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        return proba